@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import random
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Union
+
+from main import FiniteAutomaton, EPSILON, Symbol
+
+Automaton = FiniteAutomaton[int, Union[str, int]]
+Transitions = Dict[Tuple[Union[int, Symbol], Union[str, int, Symbol]], Set[Union[int, Symbol]]]
+Result = Dict[str, Union[str, int, float]]
+
+
+def blowup(n: int) -> Automaton:
+    transitions: Transitions = {(0, 'a'): {0, 1}, (0, 'b'): {0}}
+
+    for i in range(1, n + 1):
+        transitions[(i, 'a')] = {i + 1}
+        transitions[(i, 'b')] = {i + 1}
+
+    return FiniteAutomaton(set(range(n + 2)), {'a', 'b'}, transitions, 0, {n + 1})
+
+
+def epsilon_chain(n: int) -> Automaton:
+    transitions: Transitions = {}
+
+    for i in range(n):
+        transitions[(i, EPSILON)] = {i + 1}
+        transitions[(i, 'a' if i % 2 else 'b')] = {i}
+
+    return FiniteAutomaton(set(range(n + 1)), {'a', 'b'}, transitions, 0, {n})
+
+
+def dense_random(n: int, seed: int = 0, density: float = 0.3) -> Automaton:
+    rng = random.Random(seed)
+    transitions: Transitions = {}
+
+    for state in range(n):
+        for symbol in "ab":
+            targets = {target for target in range(n) if rng.random() < density}
+
+            if targets:
+                transitions[(state, symbol)] = targets
+
+    return FiniteAutomaton(set(range(n)), {'a', 'b'}, transitions, 0, {n - 1})
+
+
+def large_alphabet(n: int) -> Automaton:
+    transitions: Transitions = {}
+
+    for state in range(3):
+        for symbol in range(n):
+            transitions[(state, symbol)] = {(state + symbol) % 3, state}
+
+    return FiniteAutomaton({0, 1, 2}, set(range(n)), transitions, 0, {0})
+
+
+FAMILIES: Dict[str, Tuple[Callable[[int], Automaton], List[int]]] = {
+    "blowup": (blowup, [4, 8, 12]),
+    "epsilon-chain": (epsilon_chain, [100, 300]),
+    "dense-random": (dense_random, [8, 16, 24]),
+    "large-alphabet": (large_alphabet, [100, 1000]),
+}
+
+
+Operation = Callable[[Automaton], object]
+
+
+def operations(word: List[Union[str, int]]) -> Dict[str, Tuple[Operation, Operation]]:
+    return {
+        "determinize": (lambda fa: None, lambda fa: fa.determinize()),
+        "remove_epsilon_transitions": (lambda fa: None, lambda fa: fa.remove_epsilon_transitions()),
+        "accepts": (lambda fa: fa.compile(), lambda fa: fa.accepts(word)),
+        "compute": (lambda fa: fa.determinize(), lambda fa: deque(fa.compute(word), maxlen=0)),
+        "mermaid": (lambda fa: None, lambda fa: fa.mermaid()),
+    }
+
+
+def measure(
+        factory: Callable[[], Automaton],
+        prepare: Operation,
+        operation: Operation,
+        repeat: int
+) -> Tuple[List[float], int]:
+    timings = []
+
+    for _ in range(repeat):
+        fa = factory()
+        prepare(fa)
+        begin = time.perf_counter()
+        operation(fa)
+        timings.append(time.perf_counter() - begin)
+
+    fa = factory()
+    prepare(fa)
+    tracemalloc.start()
+
+    try:
+        operation(fa)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return timings, peak
+
+
+def run(
+        families: Iterable[str] = FAMILIES,
+        repeat: int = 5,
+        word_length: int = 10000,
+        seed: int = 0
+) -> List[Result]:
+    results: List[Result] = []
+
+    for family in families:
+        build, sizes = FAMILIES[family]
+
+        for size in sizes:
+            sample = build(size)
+            rng = random.Random(seed)
+            word = rng.choices(sorted(sample.alphabet), k=word_length)  # type: ignore[type-var]
+
+            for name, (prepare, operation) in operations(word).items():
+                timings, peak = measure(lambda: build(size), prepare, operation, repeat)
+                results.append({
+                    "family": family,
+                    "size": size,
+                    "operation": name,
+                    "states": len(sample.states),
+                    "symbols": len(sample.alphabet),
+                    "deterministic_states": len(sample.determinize().states),
+                    "repeat": repeat,
+                    "min_seconds": min(timings),
+                    "mean_seconds": sum(timings) / len(timings),
+                    "peak_bytes": peak,
+                })
+
+    return results
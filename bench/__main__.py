@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+
+from bench import FAMILIES, run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmark finite automaton operations.")
+    parser.add_argument("--family", action="append", choices=sorted(FAMILIES), help="family to run (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repetitions per operation")
+    parser.add_argument("--word-length", type=int, default=10000, help="length of the input word")
+    parser.add_argument("--seed", type=int, default=0, help="seed for generated words")
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout, help="file to write JSON to")
+    args = parser.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": run(args.family or FAMILIES, args.repeat, args.word_length, args.seed),
+    }
+
+    json.dump(report, args.output, indent=2)
+    args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
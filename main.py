@@ -1,24 +1,86 @@
 from __future__ import annotations
 
-from collections import deque
+import hashlib
+import mmap
+import os
+import string
+import struct
+import sys
+import time
+from array import array
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, as_completed, wait
 from functools import lru_cache
+from itertools import count, islice
 from typing import Set, Generic, Iterable, Iterator, Dict, Tuple, Union, \
-    Deque, TypeVar, TypeAlias, Literal, Final, final, List
+    Deque, TypeVar, TypeAlias, Literal, Final, final, List, Optional, Sequence, AbstractSet, FrozenSet, \
+    Callable, Hashable, NamedTuple, IO, Sized
+from weakref import WeakValueDictionary
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 TState = TypeVar("TState")
 TSymbol = TypeVar("TSymbol")
 
 AutomatonType: TypeAlias = Literal["dfa", "nfa", "epsilon-nfa"]
+DeterminizeEngine: TypeAlias = Literal["subset", "bitset"]
+ComputeEngine: TypeAlias = Literal["dfa", "nfa"]
+MemoPolicy: TypeAlias = Literal["lru", "lfu"]
+RegexConstruction: TypeAlias = Literal["thompson", "glushkov"]
+RegexNode: TypeAlias = Tuple[object, ...]
+
+BYTES_LIKE: Final[Tuple[type, ...]] = (bytes, bytearray, memoryview, mmap.mmap)
 
 
 @final
 class Symbol:
-    def __init__(self, symbol: str) -> None:
-        self.__symbol = symbol
-        self.__hash = id(self)
+    __slots__ = ("__symbol", "__hash", "__weakref__")
+    __registry: Final[WeakValueDictionary[str, Symbol]] = WeakValueDictionary()
+    __sentinels: Final[Dict[str, Symbol]] = {}
+
+    def __new__(cls, symbol: str) -> Symbol:
+        interned = cls.__registry.get(symbol)
+
+        if interned is not None:
+            return interned
+
+        return cls.__registry.setdefault(symbol, cls.__build(symbol, b""))
+
+    @classmethod
+    def _sentinel(cls, symbol: str) -> Symbol:
+        sentinel = cls.__sentinels.get(symbol)
+
+        if sentinel is None:
+            sentinel = cls.__sentinels[symbol] = cls.__build(symbol, b"\0")
+
+        return sentinel
+
+    @classmethod
+    def __build(cls, symbol: str, salt: bytes) -> Symbol:
+        instance = super().__new__(cls)
+        instance.__symbol = symbol
+        digest = hashlib.blake2b(salt + symbol.encode("utf-8", "surrogatepass"), digest_size=8).digest()
+        instance.__hash = int.from_bytes(digest, "little", signed=True)
+        return instance
+
+    @property
+    def is_sentinel(self) -> bool:
+        return Symbol.__sentinels.get(self.__symbol) is self
+
+    def __reduce__(self) -> Tuple[Callable[[str], Symbol], Tuple[str]]:
+        return (Symbol._sentinel if self.is_sentinel else Symbol), (self.__symbol,)
 
     def __repr__(self) -> str:
-        return f"Symbol({repr(self.__symbol)})"
+        return f"<{self.__symbol}>" if self.is_sentinel else f"Symbol({repr(self.__symbol)})"
 
     def __str__(self) -> str:
         return self.__symbol
@@ -33,15 +95,23 @@ class Symbol:
         return len(self.__symbol)
 
 
-EMPTY: Final[Symbol] = Symbol("empty")
-EPSILON: Final[Symbol] = Symbol("ε")
-START: Final[Symbol] = Symbol("start")
+EMPTY: Final[Symbol] = Symbol._sentinel("empty")
+EPSILON: Final[Symbol] = Symbol._sentinel("ε")
+START: Final[Symbol] = Symbol._sentinel("start")
+SCAN: Final[Symbol] = Symbol._sentinel("scan")
+
+
+class Match(NamedTuple):
+    start: int
+    end: int
 
 
 class SubsetState(Generic[TState]):
+    __slots__ = ("__states", "__symbol")
+
     def __init__(self, *args: Union[TState]) -> None:
         self.__states: List[TState] = list(args)
-        self.__symbol: Symbol = Symbol(str(self))
+        self.__symbol: Optional[Symbol] = None
 
     @property
     def states(self) -> List[TState]:
@@ -69,236 +139,1807 @@ class SubsetState(Generic[TState]):
         return iter(self.states)
 
     def to_symbol(self) -> Symbol:
-        return self.__symbol
-
-
-class Language(Generic[TState, TSymbol]):
-    def __init__(self, automaton: FiniteAutomaton[TState, TSymbol]) -> None:
-        self.__automaton = automaton
-
-    def __contains__(self, item: object) -> bool:
-        if not isinstance(item, Iterable):
-            return False
-
-        return self.__automaton.accepts(item)
+        if self.__symbol is None:
+            self.__symbol = Symbol(f"[{', '.join(repr(state) for state in self.__states)}]")
 
-    def __repr__(self) -> str:
-        return f"{self.__class__.__name__}({repr(self.__automaton)})"
+        return self.__symbol
 
-    __str__ = __repr__
 
+@final
+class CompiledDFA(Generic[TState, TSymbol]):
+    __MAGIC: Final[bytes] = b"PYFA"
+    __VERSION: Final[int] = 1
+    __BYTEORDER: Final[bytes] = b"<" if sys.byteorder == "little" else b">"
+    __HEADER: Final[struct.Struct] = struct.Struct("<4sHcBIII")
+    __ENTRY: Final[struct.Struct] = struct.Struct("<cI")
+    __CHUNK: Final[int] = 1 << 24
 
-class FiniteAutomaton(Generic[TState, TSymbol]):
     def __init__(
             self,
-            states: Set[Union[TState, Symbol]],
-            alphabet: Set[Union[TSymbol, Symbol]],
-            transitions: Dict[Tuple[Union[TState, Symbol], Union[TSymbol, Symbol]], Set[Union[TState, Symbol]]],
-            start: Union[TState, Symbol],
-            accepting: Set[Union[TState, Symbol]]
+            states: Sequence[Union[TState, Symbol]],
+            alphabet: Sequence[Union[TSymbol, Symbol]],
+            table: Sequence[int],
+            start: int,
+            accepting: AbstractSet[int]
     ) -> None:
-        if not states:
-            raise ValueError("A finite automaton must have at least one state")
-
-        if not alphabet:
-            raise ValueError("A finite automaton must have at least one symbol in its input alphabet")
+        if len(table) != len(states) * len(alphabet):
+            raise ValueError("The transition table must have exactly one entry per state and symbol")
 
-        if start not in states:
+        if not 0 <= start < len(states):
             raise ValueError("The start state must be in the states")
 
-        if not accepting.issubset(states):
+        if not all(0 <= state < len(states) for state in accepting):
             raise ValueError("The accepting states must be a subset of the states")
 
-        self.__states = states
-        self.__alphabet = alphabet
-        self.__transitions = transitions
+        self.__states: Tuple[Union[TState, Symbol], ...] = tuple(states)
+        self.__alphabet: Tuple[Union[TSymbol, Symbol], ...] = tuple(alphabet)
+        self.__index: Dict[Union[TSymbol, Symbol], int] = {symbol: i for i, symbol in enumerate(self.__alphabet)}
+        self.__table: Sequence[int] = table
         self.__start = start
-        self.__final = accepting
-        self.__type: AutomatonType = self.__get_type()
-
-    def __is_total(self) -> bool:
-        for state in self.__states:
-            for symbol in self.__alphabet:
-                if (state, symbol) not in self.__transitions:
-                    return False
-
-        return True
-
-    def __get_type(self) -> AutomatonType:
-        if any(symbol == EPSILON for _, symbol in self.__transitions.keys()):
-            return "epsilon-nfa"
-        elif all(len(states) <= 1 for states in self.__transitions.values()) and self.__is_total():
-            return "dfa"
-        else:
-            return "nfa"
+        self.__final: FrozenSet[int] = frozenset(accepting)
+        self.__arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.__live: Optional[FrozenSet[int]] = None
+        self.__byte_tables: Dict[Optional[int], array[int]] = {}
+        self.__byte_offsets: Optional[List[int]] = None
+        self.__offsets: Optional[List[int]] = None
 
     @property
-    def states(self) -> Set[Union[TState, Symbol]]:
+    def states(self) -> Tuple[Union[TState, Symbol], ...]:
         return self.__states
 
     @property
-    def alphabet(self) -> Set[Union[TSymbol, Symbol]]:
+    def alphabet(self) -> Tuple[Union[TSymbol, Symbol], ...]:
         return self.__alphabet
 
     @property
-    def transitions(self) -> Dict[Tuple[Union[TState, Symbol], Union[TSymbol, Symbol]], Set[Union[TState, Symbol]]]:
-        return self.__transitions
+    def table(self) -> Sequence[int]:
+        return self.__table
 
     @property
-    def start(self) -> Union[TState, Symbol]:
+    def start(self) -> int:
         return self.__start
 
     @property
-    def accepting(self) -> Set[Union[TState, Symbol]]:
+    def accepting(self) -> FrozenSet[int]:
         return self.__final
 
+    def run(self, word: Iterable[Union[TSymbol, Symbol]]) -> int:
+        return self.run_from(self.__start, word)
+
+    def run_from(self, state: int, word: Iterable[Union[TSymbol, Symbol]]) -> int:
+        if isinstance(word, BYTES_LIKE):
+            return self.__run_bytes(state, word)
+
+        table = self.__table
+        index = self.__index
+        width = len(self.__alphabet)
+
+        for symbol in word:
+            try:
+                state = table[state * width + index[symbol]]
+            except KeyError as e:
+                raise ValueError(
+                    f"Illegal transition ({repr(self.__states[state])}, {repr(symbol)})"
+                ) from e
+
+        return state
+
+    def __run_bytes(self, state: int, word: Union[bytes, bytearray, memoryview, mmap.mmap]) -> int:
+        offsets = self.__get_byte_offsets()
+        offset = state << 8
+
+        with memoryview(word) as view, view.cast("B") as data:
+            for byte in word if isinstance(word, (bytes, bytearray)) else data:
+                offset = offsets[offset + byte]
+
+            if offset >> 8 == len(self.__states):
+                byte = next(byte for byte in data if self.__byte_column(byte) < 0)
+                raise ValueError(f"Illegal symbol {repr(bytes((byte,)))}")
+
+        return offset >> 8
+
+    def __get_byte_offsets(self) -> List[int]:
+        if self.__byte_offsets is None:
+            self.__byte_offsets = [state << 8 for state in self.byte_table()]
+
+        return self.__byte_offsets
+
+    def __get_offsets(self) -> List[int]:
+        if self.__offsets is None:
+            self.__offsets = [state * len(self.__alphabet) for state in self.__table]
+
+        return self.__offsets
+
+    def __byte_column(self, byte: int) -> int:
+        for symbol in (byte, bytes((byte,)), chr(byte)):
+            column = self.__index.get(symbol)
+
+            if column is not None:
+                return column
+
+        return -1
+
+    def byte_table(self, default: Optional[int] = None) -> array[int]:
+        table = self.__byte_tables.get(default)
+
+        if table is not None:
+            return table
+
+        columns = [self.__byte_column(byte) for byte in range(256)]
+        width = len(self.__alphabet)
+        dead = len(self.__states) if default is None else default
+        table = array("i")
+
+        for row in range(0, len(self.__table), width):
+            table.extend([self.__table[row + column] if column >= 0 else dead for column in columns])
+
+        if default is None:
+            table.extend([dead] * 256)
+
+        self.__byte_tables[default] = table
+        return table
+
     @property
-    def type(self) -> AutomatonType:
-        return self.__type
+    def live(self) -> FrozenSet[int]:
+        if self.__live is None:
+            width = len(self.__alphabet)
+            predecessors: List[List[int]] = [[] for _ in self.__states]
 
-    @lru_cache
-    def accepts(self, word: Iterable[Union[TSymbol, Symbol]]) -> bool:
-        *_, last_state = self.compute(word)
-        return last_state in self.__final
+            for i, state in enumerate(self.__table):
+                predecessors[state].append(i // width)
 
-    def compute(self, word: Iterable[Union[TSymbol, Symbol]]) -> Iterator[Union[TState, Symbol]]:
-        if self.__type != "dfa":
-            yield from self.determinize().compute(word)
-            return
+            live = set(self.__final)
+            queue = deque(live)
+
+            while queue:
+                for previous_state in predecessors[queue.popleft()]:
+                    if previous_state not in live:
+                        live.add(previous_state)
+                        queue.append(previous_state)
+
+            self.__live = frozenset(live)
+
+        return self.__live
 
+    def encode(self, word: Iterable[Union[TSymbol, Symbol]]) -> array[int]:
+        index = self.__index
+        return array("i", [index.get(symbol, -1) for symbol in word])
+
+    def trace(self, word: Iterable[Union[TSymbol, Symbol]]) -> array[int]:
+        table = self.__table
+        index = self.__index
+        width = len(self.__alphabet)
         state = self.__start
-        yield state
+        trace = array("i", [state])
 
         for symbol in word:
             try:
-                _state, = self.__transitions[(state, symbol)]
+                state = table[state * width + index[symbol]]
             except KeyError as e:
                 raise ValueError(
-                    f"Illegal transition ({repr(state)}, {repr(symbol)})"
+                    f"Illegal transition ({repr(self.__states[state])}, {repr(symbol)})"
                 ) from e
 
-            state = _state
-            yield state
+            trace.append(state)
+
+        return trace
+
+    def transfer(self, word: Iterable[Union[TSymbol, Symbol]]) -> List[int]:
+        if isinstance(word, BYTES_LIKE):
+            with memoryview(word) as view, view.cast("B") as data:
+                mapping = self.__transfer(data, self.__get_byte_offsets(), 256)
+
+            if len(self.__states) in mapping:
+                byte = next(byte for byte in bytes(word) if self.__byte_column(byte) < 0)
+                raise ValueError(f"Illegal symbol {repr(bytes((byte,)))}")
+
+            return mapping
+
+        index = self.__index
+
+        try:
+            symbols = [index[symbol] for symbol in word]
+        except KeyError as e:
+            raise ValueError(f"Illegal symbol {repr(e.args[0])}") from e
+
+        return self.__transfer(symbols, self.__get_offsets(), len(self.__alphabet))
+
+    def __transfer(self, symbols: Iterable[int], offsets: Sequence[int], width: int) -> List[int]:
+        states = [state * width for state in range(len(self.__states))]
+        owners = list(range(len(self.__states)))
+        symbols = iter(symbols)
+
+        for symbol in symbols:
+            if len(states) == 1:
+                offset = offsets[states[0] + symbol]
+
+                for symbol in symbols:
+                    offset = offsets[offset + symbol]
+
+                return [offset // width] * len(owners)
+
+            positions: Dict[int, int] = {}
+            next_states: List[int] = []
+            moves: List[int] = []
+
+            for state in states:
+                next_state = offsets[state + symbol]
+                position = positions.get(next_state)
+
+                if position is None:
+                    position = positions[next_state] = len(next_states)
+                    next_states.append(next_state)
+
+                moves.append(position)
+
+            if len(next_states) < len(states):
+                owners = [moves[owner] for owner in owners]
+
+            states = next_states
+
+        return [states[owner] // width for owner in owners]
+
+    def accepts(self, word: Iterable[Union[TSymbol, Symbol]], workers: Optional[int] = None) -> bool:
+        if workers is None or workers <= 1:
+            return self.run(word) in self.__final
+
+        if not isinstance(word, (Sequence, *BYTES_LIKE)):
+            word = tuple(word)
+
+        if not len(word):
+            return self.run(word) in self.__final
+
+        with ProcessPoolExecutor(workers, initializer=_initialize_worker, initargs=(self,)) as executor:
+            if isinstance(word, BYTES_LIKE):
+                with memoryview(word) as view, view.cast("B") as data:
+                    mappings = self.__map_bounded(executor, data, workers)
+            else:
+                mappings = self.__map_bounded(executor, word, workers)
+
+        return self.__compose(mappings) in self.__final
+
+    def accepts_file(self, path: Union[str, os.PathLike[str]], workers: Optional[int] = None) -> bool:
+        size = os.path.getsize(path)
+
+        if not size:
+            return self.accepts(b"")
+
+        if workers is None or workers <= 1:
+            with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self.accepts(data)
+
+        step = -(-size // workers)
+        spans = [(os.fspath(path), i, min(i + step, size)) for i in range(0, size, step)]
+
+        with ProcessPoolExecutor(workers, initializer=_initialize_worker, initargs=(self,)) as executor:
+            mappings = list(executor.map(_transfer_file_in_worker, spans))
+
+        return self.__compose(mappings) in self.__final
+
+    def __compose(self, mappings: Iterable[List[int]]) -> int:
+        state = self.__start
+
+        for mapping in mappings:
+            state = mapping[state]
+
+        return state
+
+    @classmethod
+    def __map_bounded(
+            cls,
+            executor: ProcessPoolExecutor,
+            word: Sequence[Union[TSymbol, Symbol]],
+            workers: int
+    ) -> List[List[int]]:
+        size = min(-(-len(word) // workers), cls.__CHUNK)
+        pending: Deque[Future[List[int]]] = deque()
+        mappings: List[List[int]] = []
+
+        for i in range(0, len(word), size):
+            chunk = word[i:i + size]
+
+            if len(pending) >= 2 * workers:
+                mappings.append(pending.popleft().result())
+
+            pending.append(executor.submit(
+                _transfer_in_worker, chunk.tobytes() if isinstance(chunk, memoryview) else chunk
+            ))
+
+        mappings.extend(future.result() for future in pending)
+        return mappings
+
+    def accepts_many(self, words: Iterable[Iterable[Union[TSymbol, Symbol]]]) -> List[bool]:
+        if np is None:
+            return [self.accepts(word) for word in words]
+
+        words = list(words)
+
+        if not words:
+            return []
+
+        if self.__arrays is None:
+            accepting = np.zeros(len(self.__states), dtype=bool)
+            accepting[list(self.__final)] = True
+            table = np.asarray(self.__table, dtype=np.intp).reshape(len(self.__states), len(self.__alphabet))
+            self.__arrays = table, accepting
+
+        table, accepting = self.__arrays
+
+        if all(type(word) is str for word in words) and all(
+                type(symbol) is str and len(symbol) == 1 for symbol in self.__alphabet
+        ):
+            lengths, symbols = self.__encode_text(words)
+        else:
+            lengths, symbols = self.__encode_words(words)
+
+        order = np.argsort(-lengths, kind="stable")
+        starts = (np.cumsum(lengths) - lengths)[order]
+        active = len(words) - np.searchsorted(np.sort(lengths), np.arange(lengths.max()), side="right")
+        states = np.full(len(words), self.__start, dtype=np.intp)
+
+        for position, count in enumerate(active):
+            states[:count] = table[states[:count], symbols[starts[:count] + position]]
+
+        result = np.empty(len(words), dtype=bool)
+        result[order] = accepting[states]
+
+        return result.tolist()
+
+    def __encode_text(self, words: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        lengths = np.fromiter(map(len, words), dtype=np.intp, count=len(words))
+        codes = np.frombuffer("".join(words).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        lookup = np.full(max(map(ord, self.__index)) + 1, -1, dtype=np.intp)
+
+        for symbol, i in self.__index.items():
+            lookup[ord(symbol)] = i
+
+        symbols = np.full(len(codes), -1, dtype=np.intp)
+        known = codes < len(lookup)
+        symbols[known] = lookup[codes[known]]
+        illegal = np.flatnonzero(symbols < 0)
+
+        if len(illegal):
+            raise ValueError(f"Illegal symbol {repr(chr(codes[illegal[0]]))}")
+
+        return lengths, symbols
+
+    def __encode_words(self, words: List[Iterable[Union[TSymbol, Symbol]]]) -> Tuple[np.ndarray, np.ndarray]:
+        index = self.__index
+        lengths: List[int] = []
+        symbols: List[int] = []
+
+        for word in words:
+            length = len(symbols)
+
+            try:
+                symbols.extend(index[symbol] for symbol in word)
+            except KeyError as e:
+                raise ValueError(f"Illegal symbol {repr(e.args[0])}") from e
+
+            lengths.append(len(symbols) - length)
+
+        return np.array(lengths, dtype=np.intp), np.array(symbols, dtype=np.intp)
+
+    def save(self, path: Union[str, os.PathLike[str]]) -> None:
+        table = array("i", self.__table)
+        symbols = bytearray()
+
+        for symbol in self.__alphabet:
+            if type(symbol) is str:
+                tag, payload = b"s", symbol.encode()
+            elif type(symbol) is int:
+                tag, payload = b"i", str(symbol).encode()
+            elif type(symbol) is bytes:
+                tag, payload = b"b", symbol
+            elif type(symbol) is Symbol:
+                tag, payload = b"r" if symbol.is_sentinel else b"y", str(symbol).encode()
+            else:
+                raise ValueError(f"The symbol {repr(symbol)} cannot be serialized")
+
+            symbols += self.__ENTRY.pack(tag, len(payload)) + payload
+
+        bitmap = bytearray((len(self.__states) + 7) // 8)
+
+        for state in self.__final:
+            bitmap[state >> 3] |= 1 << (state & 7)
+
+        header = self.__HEADER.pack(
+            self.__MAGIC,
+            self.__VERSION,
+            self.__BYTEORDER,
+            table.itemsize,
+            len(self.__states),
+            len(self.__alphabet),
+            self.__start
+        )
+        body = header + symbols + bitmap
+
+        with open(path, "wb") as file:
+            file.write(body + bytes(-len(body) % table.itemsize))
+            table.tofile(file)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike[str]], mmap: bool = True) -> CompiledDFA[int, object]:
+        with open(path, "rb") as file:
+            data = memoryview(cls.__map(file) if mmap else file.read())
+
+        if len(data) < cls.__HEADER.size:
+            raise ValueError("The file is not a compiled automaton")
+
+        magic, version, byteorder, itemsize, n_states, n_symbols, start = cls.__HEADER.unpack_from(data)
+
+        if magic != cls.__MAGIC:
+            raise ValueError("The file is not a compiled automaton")
+
+        if version != cls.__VERSION:
+            raise ValueError(f"Unsupported compiled automaton format version {version}")
+
+        if itemsize != array("i").itemsize:
+            raise ValueError(f"Unsupported transition table item size {itemsize}")
+
+        offset = cls.__HEADER.size
+        alphabet: List[object] = []
+
+        for _ in range(n_symbols):
+            tag, length = cls.__ENTRY.unpack_from(data, offset)
+            payload = bytes(data[offset + cls.__ENTRY.size:offset + cls.__ENTRY.size + length])
+            offset += cls.__ENTRY.size + length
+
+            if tag == b"s":
+                alphabet.append(payload.decode())
+            elif tag == b"i":
+                alphabet.append(int(payload))
+            elif tag == b"b":
+                alphabet.append(payload)
+            elif tag == b"y":
+                alphabet.append(Symbol(payload.decode()))
+            elif tag == b"r":
+                alphabet.append(Symbol._sentinel(payload.decode()))
+            else:
+                raise ValueError(f"Unknown symbol tag {repr(tag)}")
+
+        bitmap = data[offset:offset + (n_states + 7) // 8]
+        accepting = {state for state in range(n_states) if bitmap[state >> 3] >> (state & 7) & 1}
+        offset += len(bitmap)
+        offset += -offset % itemsize
+        raw = data[offset:offset + n_states * n_symbols * itemsize]
+        table: Sequence[int]
+
+        if mmap and byteorder == cls.__BYTEORDER:
+            table = raw.cast("i")
+        else:
+            table = array("i", raw.tobytes())
+
+            if byteorder != cls.__BYTEORDER:
+                table.byteswap()
+
+        return cls(range(n_states), alphabet, table, start, accepting)
+
+    @staticmethod
+    def __map(file: IO[bytes]) -> mmap.mmap:
+        if not os.fstat(file.fileno()).st_size:
+            raise ValueError("The file is not a compiled automaton")
+
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __getstate__(self) -> Dict[str, object]:
+        state = self.__dict__.copy()
+        state["_CompiledDFA__arrays"] = None
+        state["_CompiledDFA__byte_tables"] = {}
+        state["_CompiledDFA__byte_offsets"] = None
+        state["_CompiledDFA__offsets"] = None
+
+        if isinstance(self.__table, memoryview):
+            state["_CompiledDFA__table"] = array("i", self.__table)
+
+        return state
 
     def __repr__(self) -> str:
         props = [
-            f"states={repr(self.__states)}",
+            f"states={len(self.__states)}",
             f"alphabet={repr(self.__alphabet)}",
-            f"transitions={repr(self.__transitions)}",
-            f"start={repr(self.__start)}",
-            f"accepting={repr(self.__final)}"
+            f"start={self.__start}",
+            f"accepting={sorted(self.__final)}"
         ]
 
         return f"{self.__class__.__name__}({', '.join(props)})"
 
-    def __str__(self) -> str:
-        props = [self.__states, self.__alphabet, self.__transitions, self.__start, self.__final]
-        return f"({', '.join(map(repr, props))})"
 
-    def mermaid(self) -> str:
-        states = list(self.__states)
-        nodes = (f"{i}([\"{state}\"])" for i, state in enumerate(states))
+_worker_dfa: Optional[CompiledDFA[object, object]] = None
 
-        edges = (
-            f"{states.index(state)} -- {symbol} --> {states.index(new_state)}"
-            for (state, symbol), new_states in self.__transitions.items()
-            for new_state in new_states
-        )
 
-        lines = (
-            "graph LR",
-            *map(lambda node: f"\t{node}", nodes),
-            *map(lambda edge: f"\t{edge}", edges)
-        )
+def _initialize_worker(dfa: CompiledDFA[object, object]) -> None:
+    global _worker_dfa
+    _worker_dfa = dfa
 
-        return "\n".join(lines)
 
-    def __reachable_without_read(self, start: Union[TState, Symbol]) -> Set[Union[TState, Symbol]]:
-        queue = deque([start])
-        visited = {start}
+def _transfer_in_worker(word: Sequence[object]) -> List[int]:
+    assert _worker_dfa is not None
+    return _worker_dfa.transfer(word)
 
-        while queue:
-            state = queue.popleft()
 
-            for state in self.__transitions.get((state, EPSILON), set()):
-                if state not in visited:
-                    queue.append(state)
-                    visited.add(state)
+def _transfer_file_in_worker(span: Tuple[str, int, int]) -> List[int]:
+    assert _worker_dfa is not None
+    path, start, stop = span
 
-        return visited
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        with memoryview(data) as view, view[start:stop] as chunk:
+            return _worker_dfa.transfer(chunk)
 
-    def remove_epsilon_transitions(self) -> FiniteAutomaton[TState, TSymbol]:
-        if self.__type != "epsilon-nfa":
-            return self
 
-        new_transitions: Dict[Tuple[Union[TState, Symbol], Union[TSymbol, Symbol]], Set[Union[TState, Symbol]]] = {}
+def _accepts_many_in_worker(words: List[Iterable[object]]) -> List[bool]:
+    assert _worker_dfa is not None
+    return _worker_dfa.accepts_many(words)
 
-        for state in self.__states:
-            for symbol in self.__alphabet:
-                next1 = self.__reachable_without_read(state)
-                next2: Set[Union[TState, Symbol]] = set()
 
-                for s in next1:
-                    next2.update(self.__transitions.get((s, symbol), set()))
+@final
+class Runner(Generic[TState, TSymbol]):
+    def __init__(self, dfa: CompiledDFA[TState, TSymbol]) -> None:
+        self.__dfa = dfa
+        self.__state = dfa.start
 
-                next3: Set[Union[TState, Symbol]] = set()
+    @property
+    def dfa(self) -> CompiledDFA[TState, TSymbol]:
+        return self.__dfa
 
-                for s in next2:
-                    next3.update(self.__reachable_without_read(s))
+    @property
+    def state(self) -> Union[TState, Symbol]:
+        return self.__dfa.states[self.__state]
 
-                new_transitions[(state, symbol)] = next3
+    @property
+    def accepting(self) -> bool:
+        return self.__state in self.__dfa.accepting
 
-        for (state, symbol), states in new_transitions.copy().items():
-            if state == self.__start:
-                new_transitions[(START, symbol)] = states
+    def feed(self, chunk: Iterable[Union[TSymbol, Symbol]]) -> None:
+        self.__state = self.__dfa.run_from(self.__state, chunk)
 
-        return FiniteAutomaton(self.__states | {START}, self.__alphabet, new_transitions, START, self.__final)
+    def result(self) -> bool:
+        return self.accepting
 
-    def determinize(self) -> FiniteAutomaton[TState, TSymbol]:
-        if self.__type == "dfa":
-            return self
+    def reset(self) -> None:
+        self.__state = self.__dfa.start
 
-        if self.__type == "epsilon-nfa":
-            return self.remove_epsilon_transitions().determinize()
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(state={repr(self.state)}, accepting={self.accepting})"
 
-        start = SubsetState(self.__start)
-        states: Set[Union[SubsetState[Union[TState, Symbol]], Symbol]] = {start}
-        queue: Deque[SubsetState[Union[TState, Symbol]]] = deque([start])
-        transitions: Dict[
-            Tuple[
-                Union[SubsetState[Union[TState, Symbol]], Symbol],
-                Union[TSymbol, Symbol]
-            ],
-            Union[SubsetState[Union[TState, Symbol]], Symbol]
-        ] = {}
 
-        while queue:
-            state = queue.popleft()
+@final
+class AcceptanceMemo:
+    __DIGEST: Final[object] = object()
 
-            for symbol in self.__alphabet:
-                next_states: Set[Union[TState, Symbol]] = set()
+    def __init__(
+            self,
+            maxsize: Optional[int] = 1024,
+            max_bytes: Optional[int] = 1 << 20,
+            policy: MemoPolicy = "lru",
+            digest_threshold: Optional[int] = 256,
+            max_length: Optional[int] = 1 << 20
+    ) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("The maximum number of memoized words must not be negative")
+
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("The maximum size of the memo must not be negative")
+
+        if max_length is not None and max_length < 0:
+            raise ValueError("The maximum length of memoized words must not be negative")
+
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy {repr(policy)}")
+
+        self.__maxsize = maxsize
+        self.__max_bytes = max_bytes
+        self.__policy: MemoPolicy = policy
+        self.__digest_threshold = digest_threshold
+        self.__max_length = max_length
+        self.__entries: Dict[Hashable, Tuple[bool, int]] = {}
+        self.__buckets: Dict[int, OrderedDict[Hashable, None]] = {}
+        self.__counts: Dict[Hashable, int] = {}
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
 
-                for s in state:
-                    next_states.update(self.__transitions.get((s, symbol), set()))
+    @property
+    def hits(self) -> int:
+        return self.__hits
 
-                if not next_states:
-                    transitions[(state, symbol)] = EMPTY
-                    states.add(EMPTY)
-                    continue
+    @property
+    def misses(self) -> int:
+        return self.__misses
 
-                try:
-                    next_state = next(s for s in states if type(s) is SubsetState and set(s.states) == next_states)
-                except StopIteration:
-                    next_state = SubsetState(*next_states)
-                    states.add(next_state)
-                    queue.append(next_state)
+    @property
+    def currsize(self) -> int:
+        return len(self.__entries)
 
-                transitions[(state, symbol)] = next_state
+    @property
+    def nbytes(self) -> int:
+        return self.__bytes
 
-        if EMPTY in states:
-            for symbol in self.__alphabet:
+    def key(self, word: object) -> Optional[Hashable]:
+        if self.__max_length is not None and isinstance(word, Sized) and len(word) > self.__max_length:
+            return None
+
+        if isinstance(word, (str, bytes)):
+            if self.__digest_threshold is None or len(word) < self.__digest_threshold:
+                return word
+
+            data = word.encode("utf-8", "surrogatepass") if isinstance(word, str) else word
+            return self.__DIGEST, type(word).__name__, hashlib.blake2b(data, digest_size=16).digest()
+
+        if isinstance(word, (tuple, list)):
+            if self.__digest_threshold is not None and len(word) >= self.__digest_threshold:
+                return None
+
+            key = tuple(word)
+
+            try:
+                hash(key)
+            except TypeError:
+                return None
+
+            return key
+
+        return None
+
+    def get(self, key: Hashable) -> Optional[bool]:
+        entry = self.__entries.get(key)
+
+        if entry is None:
+            self.__misses += 1
+            return None
+
+        self.__hits += 1
+        count = self.__counts[key]
+        del self.__buckets[count][key]
+
+        if not self.__buckets[count]:
+            del self.__buckets[count]
+
+        if self.__policy == "lfu":
+            count += 1
+            self.__counts[key] = count
+
+        self.__buckets.setdefault(count, OrderedDict())[key] = None
+        return entry[0]
+
+    def put(self, key: Hashable, value: bool) -> None:
+        if key in self.__entries or self.__maxsize == 0:
+            return
+
+        size = sys.getsizeof(key)
+
+        if type(key) is tuple and (not key or key[0] is not self.__DIGEST):
+            size += sum(sys.getsizeof(item) for item in key)
+
+        if self.__max_bytes is not None and size > self.__max_bytes:
+            return
+
+        while self.__entries and (
+                (self.__maxsize is not None and len(self.__entries) >= self.__maxsize)
+                or (self.__max_bytes is not None and self.__bytes + size > self.__max_bytes)
+        ):
+            self.__evict()
+
+        self.__entries[key] = (value, size)
+        self.__counts[key] = 1
+        self.__buckets.setdefault(1, OrderedDict())[key] = None
+        self.__bytes += size
+
+    def __evict(self) -> None:
+        count = min(self.__buckets)
+        bucket = self.__buckets[count]
+        key, _ = bucket.popitem(last=False)
+
+        if not bucket:
+            del self.__buckets[count]
+
+        _, size = self.__entries.pop(key)
+        del self.__counts[key]
+        self.__bytes -= size
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__buckets.clear()
+        self.__counts.clear()
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    def __repr__(self) -> str:
+        props = [
+            f"maxsize={self.__maxsize}",
+            f"max_bytes={self.__max_bytes}",
+            f"policy={repr(self.__policy)}",
+            f"digest_threshold={self.__digest_threshold}"
+        ]
+
+        return f"{self.__class__.__name__}({', '.join(props)})"
+
+
+class Language(Generic[TState, TSymbol]):
+    def __init__(self, automaton: FiniteAutomaton[TState, TSymbol]) -> None:
+        self.__automaton = automaton
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, Iterable):
+            return False
+
+        return self.__automaton.accepts(item)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Language):
+            return NotImplemented
+
+        return self.__automaton.equivalent(other.__automaton)
+
+    def __hash__(self) -> int:
+        dfa = self.__automaton.compile()
+        width = len(dfa.alphabet)
+        depths = {dfa.start: 0}
+        queue = deque([dfa.start])
+
+        while queue:
+            state = queue.popleft()
+
+            if state in dfa.accepting:
+                return hash((Language, depths[state]))
+
+            for next_state in dfa.table[state * width:(state + 1) * width]:
+                if next_state not in depths:
+                    depths[next_state] = depths[state] + 1
+                    queue.append(next_state)
+
+        return hash((Language, -1))
+
+    def __le__(self, other: object) -> bool:
+        if not isinstance(other, Language):
+            return NotImplemented
+
+        return self.__automaton.issubset(other.__automaton)
+
+    def is_universal(self) -> bool:
+        return self.__automaton.is_universal()
+
+    def classify_parallel(
+            self,
+            words: Iterable[Iterable[Union[TSymbol, Symbol]]],
+            processes: Optional[int] = None,
+            chunksize: int = 1024,
+            ordered: bool = True
+    ) -> Iterator[Tuple[Iterable[Union[TSymbol, Symbol]], bool]]:
+        if chunksize < 1:
+            raise ValueError("The chunk size must be positive")
+
+        processes = processes or os.cpu_count() or 1
+        dfa = self.__automaton.compile()
+        words = iter(words)
+        batches = iter(lambda: list(islice(words, chunksize)), [])
+        pending: Dict[Future[List[bool]], List[Iterable[Union[TSymbol, Symbol]]]] = {}
+
+        with ProcessPoolExecutor(processes, initializer=_initialize_worker, initargs=(dfa,)) as executor:
+            for batch in batches:
+                pending[executor.submit(_accepts_many_in_worker, batch)] = batch
+
+                while len(pending) >= 2 * processes:
+                    if ordered:
+                        done = [next(iter(pending))]
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        yield from zip(pending.pop(future), future.result())
+
+            for future in pending if ordered else as_completed(pending):
+                yield from zip(pending[future], future.result())
+
+    def filter(self, words: Iterable[Iterable[Union[TSymbol, Symbol]]]) -> List[Iterable[Union[TSymbol, Symbol]]]:
+        words = list(words)
+        return [word for word, accepted in zip(words, self.__automaton.accepts_many(words)) if accepted]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({repr(self.__automaton)})"
+
+    __str__ = __repr__
+
+
+class FiniteAutomaton(Generic[TState, TSymbol]):
+    __SIMULATION_LIMIT: Final[int] = 512
+
+    def __init__(
+            self,
+            states: Set[Union[TState, Symbol]],
+            alphabet: Set[Union[TSymbol, Symbol]],
+            transitions: Dict[Tuple[Union[TState, Symbol], Union[TSymbol, Symbol]], Set[Union[TState, Symbol]]],
+            start: Union[TState, Symbol],
+            accepting: Set[Union[TState, Symbol]]
+    ) -> None:
+        if not states:
+            raise ValueError("A finite automaton must have at least one state")
+
+        if not alphabet:
+            raise ValueError("A finite automaton must have at least one symbol in its input alphabet")
+
+        if start not in states:
+            raise ValueError("The start state must be in the states")
+
+        if not accepting.issubset(states):
+            raise ValueError("The accepting states must be a subset of the states")
+
+        self.__states = states
+        self.__alphabet = alphabet
+        self.__transitions = transitions
+        self.__start = start
+        self.__final = accepting
+        self.__type: AutomatonType = self.__get_type()
+        self.__closures: Optional[Dict[Union[TState, Symbol], FrozenSet[Union[TState, Symbol]]]] = None
+        self.__epsilon_free: Optional[FiniteAutomaton[TState, TSymbol]] = None
+        self.__deterministic: Dict[DeterminizeEngine, FiniteAutomaton[TState, TSymbol]] = {}
+        self.__compiled: Optional[CompiledDFA[TState, TSymbol]] = None
+        self.__memo = AcceptanceMemo()
+        self.__scanners: Optional[Tuple[CompiledDFA[TState, TSymbol], CompiledDFA[TState, TSymbol]]] = None
+        self.__generated: Optional[Callable[[Iterable[Union[TSymbol, Symbol]]], bool]] = None
+        self.__stats: Optional[Dict[str, float]] = None
+        self.__stats_callback: Optional[Callable[[str, float], None]] = None
+
+    def __is_total(self) -> bool:
+        for state in self.__states:
+            for symbol in self.__alphabet:
+                if (state, symbol) not in self.__transitions:
+                    return False
+
+        return True
+
+    def __is_deterministic(self) -> bool:
+        return self.__type != "epsilon-nfa" and all(len(states) <= 1 for states in self.__transitions.values())
+
+    def __get_type(self) -> AutomatonType:
+        if any(symbol == EPSILON for _, symbol in self.__transitions.keys()):
+            return "epsilon-nfa"
+        elif all(len(states) <= 1 for states in self.__transitions.values()) and self.__is_total():
+            return "dfa"
+        else:
+            return "nfa"
+
+    @classmethod
+    def from_regex(
+            cls,
+            pattern: str,
+            alphabet: Optional[AbstractSet[str]] = None,
+            construction: RegexConstruction = "thompson"
+    ) -> FiniteAutomaton[int, str]:
+        parsed = sre_parse.parse(pattern)
+        flags = (getattr(parsed, "state", None) or parsed.pattern).flags
+
+        if flags & (sre_constants.SRE_FLAG_IGNORECASE | sre_constants.SRE_FLAG_MULTILINE):
+            raise ValueError("The IGNORECASE and MULTILINE flags are not supported")
+
+        universe = None if alphabet is None else frozenset(alphabet)
+        used: Set[str] = set()
+        tree = cls.__regex_tree(parsed, universe, bool(flags & sre_constants.SRE_FLAG_DOTALL), used)
+        symbols = set(used if universe is None else universe)
+
+        if not symbols:
+            raise ValueError(f"The regular expression {repr(pattern)} has no symbols and requires an explicit alphabet")
+
+        if construction == "thompson":
+            return cls.__thompson(tree, symbols)
+        elif construction == "glushkov":
+            return cls.__glushkov(tree, symbols)
+        else:
+            raise ValueError(f"Unknown regular expression construction {repr(construction)}")
+
+    @staticmethod
+    def __regex_universe(alphabet: Optional[FrozenSet[str]], construct: str) -> FrozenSet[str]:
+        if alphabet is None:
+            raise ValueError(f"The regular expression construct {construct} requires an explicit alphabet")
+
+        return alphabet
+
+    @staticmethod
+    def __regex_literal(code: int, alphabet: Optional[FrozenSet[str]]) -> str:
+        if alphabet is not None and chr(code) not in alphabet:
+            raise ValueError(f"The literal {repr(chr(code))} is not in the alphabet")
+
+        return chr(code)
+
+    @staticmethod
+    def __regex_category(category: object, alphabet: Optional[FrozenSet[str]]) -> FrozenSet[str]:
+        predicates: Dict[object, Callable[[str], bool]] = {
+            sre_constants.CATEGORY_DIGIT: str.isdecimal,
+            sre_constants.CATEGORY_SPACE: str.isspace,
+            sre_constants.CATEGORY_WORD: lambda char: char.isalnum() or char == "_",
+        }
+        negated: Dict[object, object] = {
+            sre_constants.CATEGORY_NOT_DIGIT: sre_constants.CATEGORY_DIGIT,
+            sre_constants.CATEGORY_NOT_SPACE: sre_constants.CATEGORY_SPACE,
+            sre_constants.CATEGORY_NOT_WORD: sre_constants.CATEGORY_WORD,
+        }
+
+        if category in negated:
+            universe = FiniteAutomaton.__regex_universe(alphabet, str(category))
+            return universe - FiniteAutomaton.__regex_category(negated[category], alphabet)
+
+        if category not in predicates:
+            raise ValueError(f"Unsupported regular expression category {category}")
+
+        universe = frozenset(string.printable) if alphabet is None else alphabet
+        return frozenset(char for char in universe if len(char) == 1 and predicates[category](char))
+
+    @staticmethod
+    def __regex_set(items: Iterable[Tuple[object, object]], alphabet: Optional[FrozenSet[str]]) -> FrozenSet[str]:
+        chars: Set[str] = set()
+        items = list(items)
+        negate = bool(items) and items[0][0] is sre_constants.NEGATE
+
+        for op, av in items[1:] if negate else items:
+            if op is sre_constants.LITERAL:
+                chars.add(chr(av) if negate else FiniteAutomaton.__regex_literal(av, alphabet))
+            elif op is sre_constants.RANGE:
+                low, high = av
+
+                if alphabet is None:
+                    chars.update(chr(code) for code in range(low, high + 1))
+                else:
+                    chars.update(char for char in alphabet if len(char) == 1 and low <= ord(char) <= high)
+            elif op is sre_constants.CATEGORY:
+                chars.update(FiniteAutomaton.__regex_category(av, alphabet))
+            else:
+                raise ValueError(f"Unsupported regular expression construct {op}")
+
+        if negate:
+            return FiniteAutomaton.__regex_universe(alphabet, "[^...]") - chars
+
+        return frozenset(chars if alphabet is None else chars & alphabet)
+
+    @staticmethod
+    def __regex_tree(
+            pattern: Iterable[Tuple[object, object]],
+            alphabet: Optional[FrozenSet[str]],
+            dotall: bool,
+            used: Set[str]
+    ) -> RegexNode:
+        nodes: List[RegexNode] = []
+
+        for op, av in pattern:
+            if op is sre_constants.LITERAL:
+                node: RegexNode = ("chars", frozenset(FiniteAutomaton.__regex_literal(av, alphabet)))
+            elif op is sre_constants.NOT_LITERAL:
+                node = ("chars", FiniteAutomaton.__regex_universe(alphabet, "[^...]") - {chr(av)})
+            elif op is sre_constants.ANY:
+                universe = FiniteAutomaton.__regex_universe(alphabet, ".")
+                node = ("chars", universe if dotall else universe - {"\n"})
+            elif op is sre_constants.IN:
+                node = ("chars", FiniteAutomaton.__regex_set(av, alphabet))
+            elif op is sre_constants.BRANCH:
+                node = ("alt", [FiniteAutomaton.__regex_tree(branch, alphabet, dotall, used) for branch in av[1]])
+            elif op is sre_constants.SUBPATTERN:
+                node = FiniteAutomaton.__regex_tree(av[-1], alphabet, dotall, used)
+            elif op is sre_constants.MAX_REPEAT or op is sre_constants.MIN_REPEAT:
+                low, high, subpattern = av
+                child = FiniteAutomaton.__regex_tree(subpattern, alphabet, dotall, used)
+
+                if high is sre_constants.MAXREPEAT:
+                    optional = [("star", child)]
+                else:
+                    optional = [("alt", [child, ("concat", [])])] * (high - low)
+
+                node = ("concat", [child] * low + optional)
+            else:
+                raise ValueError(f"Unsupported regular expression construct {op}")
+
+            if node[0] == "chars":
+                used.update(node[1])
+
+            nodes.append(node)
+
+        return nodes[0] if len(nodes) == 1 else ("concat", nodes)
+
+    @staticmethod
+    def __thompson(tree: RegexNode, alphabet: Set[str]) -> FiniteAutomaton[int, str]:
+        transitions: Dict[Tuple[int, Union[str, Symbol]], Set[int]] = {}
+        ids = count()
+
+        def build(node: RegexNode) -> Tuple[int, int]:
+            start, end = next(ids), next(ids)
+
+            if node[0] == "chars":
+                for symbol in node[1]:
+                    transitions.setdefault((start, symbol), set()).add(end)
+            elif node[0] == "concat":
+                previous = start
+
+                for child in node[1]:
+                    first, last = build(child)
+                    transitions.setdefault((previous, EPSILON), set()).add(first)
+                    previous = last
+
+                transitions.setdefault((previous, EPSILON), set()).add(end)
+            elif node[0] == "alt":
+                for child in node[1]:
+                    first, last = build(child)
+                    transitions.setdefault((start, EPSILON), set()).add(first)
+                    transitions.setdefault((last, EPSILON), set()).add(end)
+            else:
+                first, last = build(node[1])
+                transitions.setdefault((start, EPSILON), set()).update((first, end))
+                transitions.setdefault((last, EPSILON), set()).update((first, end))
+
+            return start, end
+
+        start, end = build(tree)
+        return FiniteAutomaton(set(range(next(ids))), alphabet, transitions, start, {end})
+
+    @staticmethod
+    def __glushkov(tree: RegexNode, alphabet: Set[str]) -> FiniteAutomaton[int, str]:
+        positions: List[FrozenSet[str]] = []
+        follow: List[Set[int]] = []
+
+        def visit(node: RegexNode) -> Tuple[bool, Set[int], Set[int]]:
+            if node[0] == "chars":
+                positions.append(node[1])
+                follow.append(set())
+                return False, {len(positions) - 1}, {len(positions) - 1}
+            elif node[0] == "concat":
+                nullable, first, last = True, set(), set()
+
+                for child in node[1]:
+                    child_nullable, child_first, child_last = visit(child)
+
+                    for position in last:
+                        follow[position].update(child_first)
+
+                    first = first | child_first if nullable else first
+                    last = last | child_last if child_nullable else child_last
+                    nullable = nullable and child_nullable
+
+                return nullable, first, last
+            elif node[0] == "alt":
+                nullable, first, last = False, set(), set()
+
+                for child in node[1]:
+                    child_nullable, child_first, child_last = visit(child)
+                    nullable, first, last = nullable or child_nullable, first | child_first, last | child_last
+
+                return nullable, first, last
+            else:
+                _, first, last = visit(node[1])
+
+                for position in last:
+                    follow[position].update(first)
+
+                return True, first, last
+
+        nullable, first, last = visit(tree)
+        transitions: Dict[Tuple[int, str], Set[int]] = {}
+
+        for state, targets in [(0, first)] + [(position + 1, targets) for position, targets in enumerate(follow)]:
+            for target in targets:
+                for symbol in positions[target]:
+                    transitions.setdefault((state, symbol), set()).add(target + 1)
+
+        accepting = {position + 1 for position in last} | ({0} if nullable else set())
+        return FiniteAutomaton(set(range(len(positions) + 1)), alphabet, transitions, 0, accepting)
+
+    @property
+    def states(self) -> Set[Union[TState, Symbol]]:
+        return self.__states
+
+    @property
+    def alphabet(self) -> Set[Union[TSymbol, Symbol]]:
+        return self.__alphabet
+
+    @property
+    def transitions(self) -> Dict[Tuple[Union[TState, Symbol], Union[TSymbol, Symbol]], Set[Union[TState, Symbol]]]:
+        return self.__transitions
+
+    @property
+    def start(self) -> Union[TState, Symbol]:
+        return self.__start
+
+    @property
+    def accepting(self) -> Set[Union[TState, Symbol]]:
+        return self.__final
+
+    @property
+    def type(self) -> AutomatonType:
+        return self.__type
+
+    @property
+    def memo(self) -> AcceptanceMemo:
+        return self.__memo
+
+    @memo.setter
+    def memo(self, memo: AcceptanceMemo) -> None:
+        self.__memo = memo
+
+    def enable_stats(self, callback: Optional[Callable[[str, float], None]] = None) -> None:
+        stats: Dict[str, float] = {
+            "compute_steps": 0,
+            "symbols_consumed": 0,
+            "subsets_created": 0,
+            "queue_high_water": 0,
+            "closure_computations": 0
+        }
+
+        self.__share_stats(stats, callback)
+
+    def disable_stats(self) -> None:
+        self.__share_stats(None, None)
+
+    def stats(self) -> Dict[str, float]:
+        if self.__stats is None:
+            return {}
+
+        return {**self.__stats, "memo_hits": self.__memo.hits, "memo_misses": self.__memo.misses}
+
+    def __share_stats(
+            self,
+            stats: Optional[Dict[str, float]],
+            callback: Optional[Callable[[str, float], None]]
+    ) -> None:
+        self.__stats = stats
+        self.__stats_callback = callback
+
+        for derived in (self.__epsilon_free, *self.__deterministic.values()):
+            if derived is not None and derived is not self and derived.__stats is not stats:
+                derived.__share_stats(stats, callback)
+
+    def __record(self, phase: str, began: float) -> None:
+        assert self.__stats is not None
+        elapsed = time.perf_counter() - began
+        self.__stats[f"{phase}_seconds"] = self.__stats.get(f"{phase}_seconds", 0.0) + elapsed
+
+        if self.__stats_callback is not None:
+            self.__stats_callback(phase, elapsed)
+
+    def accepts(
+            self,
+            word: Iterable[Union[TSymbol, Symbol]],
+            engine: ComputeEngine = "dfa",
+            workers: Optional[int] = None
+    ) -> bool:
+        if engine not in ("dfa", "nfa"):
+            raise ValueError(f"Unknown computation engine {repr(engine)}")
+
+        if engine == "nfa" and workers is not None:
+            raise ValueError("Parallel execution is only supported by the dfa engine")
+
+        key = self.__memo.key(word)
+
+        if key is not None:
+            accepted = self.__memo.get(key)
+
+            if accepted is not None:
+                return accepted
+
+        accepted = self.__accepts(word, engine, workers)
+
+        if key is not None:
+            self.__memo.put(key, accepted)
+
+        return accepted
+
+    def __accepts(self, word: Iterable[Union[TSymbol, Symbol]], engine: ComputeEngine, workers: Optional[int]) -> bool:
+        if self.__stats is not None:
+            word = self.__count_symbols(word, self.__stats)
+
+        if engine == "nfa":
+            states = self.epsilon_closure({self.__start})
+
+            for symbol in word:
+                states = self.step(states, symbol)
+
+            return not states.isdisjoint(self.__final)
+
+        return self.compile().accepts(word, workers)
+
+    def run(self, word: Iterable[Union[TSymbol, Symbol]]) -> Union[TState, Symbol]:
+        if self.__stats is not None:
+            word = self.__count_symbols(word, self.__stats)
+
+        compiled = self.compile()
+        return compiled.states[compiled.run(word)]
+
+    @staticmethod
+    def __count_symbols(
+            word: Iterable[Union[TSymbol, Symbol]],
+            stats: Dict[str, float]
+    ) -> Iterable[Union[TSymbol, Symbol]]:
+        if isinstance(word, Sized):
+            stats["symbols_consumed"] += len(word)
+            return word
+
+        return FiniteAutomaton.__counted_symbols(word, stats)
+
+    @staticmethod
+    def __counted_symbols(
+            word: Iterable[Union[TSymbol, Symbol]],
+            stats: Dict[str, float]
+    ) -> Iterator[Union[TSymbol, Symbol]]:
+        for symbol in word:
+            stats["symbols_consumed"] += 1
+            yield symbol
+
+    def trace(self, word: Iterable[Union[TSymbol, Symbol]]) -> array[int]:
+        return self.compile().trace(word)
+
+    def compute(
+            self,
+            word: Iterable[Union[TSymbol, Symbol]],
+            engine: ComputeEngine = "dfa"
+    ) -> Iterator[Union[TState, Symbol, FrozenSet[Union[TState, Symbol]]]]:
+        if self.__stats is None:
+            return self.__compute(word, engine)
+
+        return self.__count_steps(self.__compute(word, engine), self.__stats)
+
+    @staticmethod
+    def __count_steps(
+            states: Iterator[Union[TState, Symbol, FrozenSet[Union[TState, Symbol]]]],
+            stats: Dict[str, float]
+    ) -> Iterator[Union[TState, Symbol, FrozenSet[Union[TState, Symbol]]]]:
+        for state in states:
+            yield state
+            break
+
+        for state in states:
+            stats["compute_steps"] += 1
+            yield state
+
+    def __compute(
+            self,
+            word: Iterable[Union[TSymbol, Symbol]],
+            engine: ComputeEngine
+    ) -> Iterator[Union[TState, Symbol, FrozenSet[Union[TState, Symbol]]]]:
+        if engine == "nfa":
+            yield from self.simulate(word)
+            return
+
+        if engine != "dfa":
+            raise ValueError(f"Unknown computation engine {repr(engine)}")
+
+        if self.__type != "dfa":
+            yield from self.determinize().__compute(word, engine)
+            return
+
+        state = self.__start
+        yield state
+
+        for symbol in word:
+            try:
+                _state, = self.__transitions[(state, symbol)]
+            except KeyError as e:
+                raise ValueError(
+                    f"Illegal transition ({repr(state)}, {repr(symbol)})"
+                ) from e
+
+            state = _state
+            yield state
+
+    def accepts_many(self, words: Iterable[Iterable[Union[TSymbol, Symbol]]]) -> List[bool]:
+        if self.__stats is not None:
+            words = [self.__count_symbols(word, self.__stats) for word in words]
+
+        return self.compile().accepts_many(words)
+
+    def runner(self) -> Runner[TState, TSymbol]:
+        return Runner(self.compile())
+
+    def step(
+            self,
+            states: Iterable[Union[TState, Symbol]],
+            symbol: Union[TSymbol, Symbol]
+    ) -> FrozenSet[Union[TState, Symbol]]:
+        if symbol not in self.__alphabet:
+            raise ValueError(f"Illegal transition ({repr(states)}, {repr(symbol)})")
+
+        next_states: Set[Union[TState, Symbol]] = set()
+
+        for state in states:
+            next_states.update(self.__transitions.get((state, symbol), set()))
+
+        return self.epsilon_closure(next_states)
+
+    def simulate(self, word: Iterable[Union[TSymbol, Symbol]]) -> Iterator[FrozenSet[Union[TState, Symbol]]]:
+        return self.simulate_from(self.epsilon_closure({self.__start}), word)
+
+    def simulate_from(
+            self,
+            states: FrozenSet[Union[TState, Symbol]],
+            word: Iterable[Union[TSymbol, Symbol]]
+    ) -> Iterator[FrozenSet[Union[TState, Symbol]]]:
+        yield states
+
+        for symbol in word:
+            states = self.step(states, symbol)
+            yield states
+
+    def compile(self) -> CompiledDFA[TState, TSymbol]:
+        if self.__compiled is not None:
+            return self.__compiled
+
+        if not self.__is_deterministic():
+            self.__compiled = self.determinize().compile()
+            return self.__compiled
+
+        began = time.perf_counter() if self.__stats is not None else 0.0
+        states: List[Union[TState, Symbol]] = [
+            self.__start, *(state for state in self.__states if state != self.__start)
+        ]
+        alphabet = list(self.__alphabet)
+        state_ids = {state: i for i, state in enumerate(states)}
+        sink = len(states)
+        table = array("i", [sink]) * (len(states) * len(alphabet))
+
+        for i, state in enumerate(states):
+            for j, symbol in enumerate(alphabet):
+                for new_state in self.__transitions.get((state, symbol), set()):
+                    table[i * len(alphabet) + j] = state_ids[new_state]
+
+        if sink in table:
+            states.append(EMPTY)
+            table.extend([sink] * len(alphabet))
+
+        accepting = {state_ids[state] for state in self.__final}
+        self.__compiled = CompiledDFA(states, alphabet, table, 0, accepting)
+
+        if self.__stats is not None:
+            self.__record("compile", began)
+
+        return self.__compiled
+
+    def codegen(
+            self,
+            cache_dir: Optional[Union[str, os.PathLike[str]]] = None
+    ) -> Callable[[Iterable[Union[TSymbol, Symbol]]], bool]:
+        if self.__generated is not None:
+            return self.__generated
+
+        compiled = self.minimize(partial=True).compile()
+        width = len(compiled.alphabet)
+        table = array("i", compiled.table)
+        fingerprint = hashlib.sha256(
+            struct.pack("<III", len(compiled.states), width, compiled.start)
+            + array("i", sorted(compiled.accepting)).tobytes()
+            + table.tobytes()
+        ).hexdigest()
+
+        if cache_dir is None:
+            cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "automata")
+
+        path = os.path.join(cache_dir, f"{fingerprint}.py")
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                source = file.read()
+        except OSError:
+            source = self.__generate_source(compiled, table)
+
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+
+                with open(f"{path}.{os.getpid()}", "w", encoding="utf-8") as file:
+                    file.write(source)
+
+                os.replace(f"{path}.{os.getpid()}", path)
+            except OSError:
+                pass
+
+        namespace: Dict[str, object] = {"_S": compiled.alphabet}
+        exec(compile(source, path, "exec"), namespace)
+        self.__generated = namespace["accepts"]  # type: ignore[assignment]
+
+        return self.__generated  # type: ignore[return-value]
+
+    @staticmethod
+    def __generate_source(compiled: CompiledDFA[TState, TSymbol], table: Sequence[int]) -> str:
+        width = len(compiled.alphabet)
+        names = [f"_T{i}" for i in range(len(compiled.states))]
+        lines = [f"{', '.join(names)} = {', '.join('{}' for _ in names)}", "_A = object()"]
+
+        for i, name in enumerate(names):
+            entries = ", ".join(f"_S[{j}]: {names[table[i * width + j]]}" for j in range(width))
+            lines.append(f"{name}.update({{{entries}}})")
+
+        lines.extend(f"{names[i]}[_A] = True" for i in sorted(compiled.accepting))
+        lines.extend([
+            "",
+            "",
+            f"def accepts(word, _T={names[compiled.start]}, _A=_A):",
+            "    state = _T",
+            "    try:",
+            "        for symbol in word:",
+            "            state = state[symbol]",
+            "    except KeyError:",
+            "        raise ValueError(f\"Illegal symbol {symbol!r}\") from None",
+            "    return _A in state",
+        ])
+
+        return "\n".join(lines) + "\n"
+
+    def __getstate__(self) -> Dict[str, object]:
+        state = self.__dict__.copy()
+        state["_FiniteAutomaton__generated"] = None
+        state["_FiniteAutomaton__stats_callback"] = None
+        return state
+
+    def __repr__(self) -> str:
+        props = [
+            f"states={repr(self.__states)}",
+            f"alphabet={repr(self.__alphabet)}",
+            f"transitions={repr(self.__transitions)}",
+            f"start={repr(self.__start)}",
+            f"accepting={repr(self.__final)}"
+        ]
+
+        return f"{self.__class__.__name__}({', '.join(props)})"
+
+    def __str__(self) -> str:
+        props = [self.__states, self.__alphabet, self.__transitions, self.__start, self.__final]
+        return f"({', '.join(map(repr, props))})"
+
+    def __get_scanners(self) -> Tuple[CompiledDFA[TState, TSymbol], CompiledDFA[TState, TSymbol]]:
+        if self.__scanners is not None:
+            return self.__scanners
+
+        automaton = self.remove_epsilon_transitions()
+        reverse_transitions: Dict[
+            Tuple[Union[TState, Symbol], Union[TSymbol, Symbol]],
+            Set[Union[TState, Symbol]]
+        ] = {(SCAN, symbol): {SCAN} for symbol in automaton.alphabet}
+
+        for (state, symbol), new_states in automaton.transitions.items():
+            for new_state in new_states:
+                reverse_transitions.setdefault((new_state, symbol), set()).add(state)
+
+                if new_state in automaton.accepting:
+                    reverse_transitions[(SCAN, symbol)].add(state)
+
+        reverse_accepting = {automaton.start}
+
+        if automaton.start in automaton.accepting:
+            reverse_accepting.add(SCAN)
+
+        reverse = FiniteAutomaton(
+            automaton.states | {SCAN}, automaton.alphabet, reverse_transitions, SCAN, reverse_accepting
+        )
+
+        self.__scanners = (self.compile(), reverse.compile())
+        return self.__scanners
+
+    def __longest_match(
+            self,
+            symbols: Sequence[int],
+            table: Sequence[int],
+            width: int,
+            start: int,
+            failed: Optional[Set[int]] = None
+    ) -> int:
+        dfa, _ = self.__get_scanners()
+        accepting = dfa.accepting
+        live = dfa.live
+        stride = len(dfa.states) + 1
+        state = dfa.start
+        end = start if state in accepting else -1
+        visited: List[int] = []
+
+        for i in range(start, len(symbols)):
+            symbol = symbols[i]
+
+            if symbol < 0:
+                break
+
+            state = table[state * width + symbol]
+
+            if state not in live:
+                break
+
+            if state in accepting:
+                end = i + 1
+
+            if failed is not None:
+                key = (i + 1) * stride + state
+
+                if key in failed:
+                    break
+
+                visited.append(key)
+
+        if failed is not None:
+            failed.update(key for key in visited if key // stride >= end)
+
+        return end
+
+    def __finditer(
+            self,
+            symbols: Sequence[int],
+            table: Sequence[int],
+            width: int,
+            reverse_symbols: Sequence[int],
+            reverse_table: Sequence[int],
+            reverse_width: int
+    ) -> Iterator[Match]:
+        _, reverse = self.__get_scanners()
+        accepting = reverse.accepting
+        state = reverse.start
+        starts = bytearray(len(symbols) + 1)
+        starts[len(symbols)] = state in accepting
+
+        for i in range(len(symbols) - 1, -1, -1):
+            symbol = reverse_symbols[i]
+            state = reverse.start if symbol < 0 else reverse_table[state * reverse_width + symbol]
+            starts[i] = state in accepting
+
+        position = 0
+        failed: Set[int] = set()
+
+        while position <= len(symbols):
+            start = starts.find(1, position)
+
+            if start < 0:
+                return
+
+            end = self.__longest_match(symbols, table, width, start, failed)
+            yield Match(start, end)
+            position = end if end > start else end + 1
+
+    def finditer(self, text: Sequence[Union[TSymbol, Symbol]]) -> Iterator[Match]:
+        dfa, reverse = self.__get_scanners()
+
+        if not isinstance(text, BYTES_LIKE):
+            yield from self.__finditer(
+                dfa.encode(text), dfa.table, len(dfa.alphabet),
+                reverse.encode(text), reverse.table, len(reverse.alphabet)
+            )
+            return
+
+        with memoryview(text) as view, view.cast("B") as data:
+            yield from self.__finditer(data, dfa.byte_table(), 256, data, reverse.byte_table(reverse.start), 256)
+
+    def search(self, text: Sequence[Union[TSymbol, Symbol]]) -> Optional[Match]:
+        return next(self.finditer(text), None)
+
+    def match(self, text: Sequence[Union[TSymbol, Symbol]]) -> Optional[Match]:
+        dfa, _ = self.__get_scanners()
+
+        if not isinstance(text, BYTES_LIKE):
+            end = self.__longest_match(dfa.encode(text), dfa.table, len(dfa.alphabet), 0)
+        else:
+            with memoryview(text) as view, view.cast("B") as data:
+                end = self.__longest_match(data, dfa.byte_table(), 256, 0)
+
+        return Match(0, end) if end >= 0 else None
+
+    def match_file(self, path: Union[str, os.PathLike[str]], workers: Optional[int] = None) -> bool:
+        if workers is not None:
+            return self.compile().accepts_file(path, workers)
+
+        with open(path, "rb") as file:
+            if not os.fstat(file.fileno()).st_size:
+                return self.accepts(b"")
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self.accepts(data)
+
+    def mermaid(self) -> str:
+        states = list(self.__states)
+        nodes = (f"{i}([\"{state}\"])" for i, state in enumerate(states))
+
+        edges = (
+            f"{states.index(state)} -- {symbol} --> {states.index(new_state)}"
+            for (state, symbol), new_states in self.__transitions.items()
+            for new_state in new_states
+        )
+
+        lines = (
+            "graph LR",
+            *map(lambda node: f"\t{node}", nodes),
+            *map(lambda edge: f"\t{edge}", edges)
+        )
+
+        return "\n".join(lines)
+
+    def __epsilon_closures(self) -> Dict[Union[TState, Symbol], FrozenSet[Union[TState, Symbol]]]:
+        if self.__closures is not None:
+            return self.__closures
+
+        def successors(state: Union[TState, Symbol]) -> Set[Union[TState, Symbol]]:
+            return self.__transitions.get((state, EPSILON), set())
+
+        closures: Dict[Union[TState, Symbol], FrozenSet[Union[TState, Symbol]]] = {}
+        index: Dict[Union[TState, Symbol], int] = {}
+        lowlink: Dict[Union[TState, Symbol], int] = {}
+        stack: List[Union[TState, Symbol]] = []
+        on_stack: Set[Union[TState, Symbol]] = set()
+
+        for root in self.__states:
+            if root in index:
+                continue
+
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(successors(root)))]
+
+            while work:
+                state, pending = work[-1]
+
+                for next_state in pending:
+                    if next_state not in index:
+                        index[next_state] = lowlink[next_state] = len(index)
+                        stack.append(next_state)
+                        on_stack.add(next_state)
+                        work.append((next_state, iter(successors(next_state))))
+                        break
+
+                    if next_state in on_stack:
+                        lowlink[state] = min(lowlink[state], index[next_state])
+                else:
+                    work.pop()
+
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[state])
+
+                    if lowlink[state] != index[state]:
+                        continue
+
+                    component: Set[Union[TState, Symbol]] = set()
+
+                    while state not in component:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+
+                    closure = set(component)
+
+                    for member in component:
+                        for next_state in successors(member):
+                            if next_state not in component:
+                                closure.update(closures[next_state])
+
+                    frozen = frozenset(closure)
+
+                    for member in component:
+                        closures[member] = frozen
+
+        if self.__stats is not None:
+            self.__stats["closure_computations"] += len(closures)
+
+        self.__closures = closures
+        return closures
+
+    def epsilon_closure(self, states: Iterable[Union[TState, Symbol]]) -> FrozenSet[Union[TState, Symbol]]:
+        closures = self.__epsilon_closures()
+        closure: Set[Union[TState, Symbol]] = set()
+
+        for state in states:
+            closure.update(closures[state])
+
+        return frozenset(closure)
+
+    def remove_epsilon_transitions(self) -> FiniteAutomaton[TState, TSymbol]:
+        if self.__type != "epsilon-nfa":
+            return self
+
+        if self.__epsilon_free is not None:
+            return self.__epsilon_free
+
+        began = time.perf_counter() if self.__stats is not None else 0.0
+        closures = self.__epsilon_closures()
+        moves: Dict[Tuple[Union[TState, Symbol], Union[TSymbol, Symbol]], Set[Union[TState, Symbol]]] = {}
+
+        for (state, symbol), states in self.__transitions.items():
+            if symbol != EPSILON:
+                moves[(state, symbol)] = set(self.epsilon_closure(states))
+
+        new_transitions: Dict[Tuple[Union[TState, Symbol], Union[TSymbol, Symbol]], Set[Union[TState, Symbol]]] = {}
+
+        for state in self.__states:
+            for symbol in self.__alphabet:
+                next_states: Set[Union[TState, Symbol]] = set()
+
+                for s in closures[state]:
+                    next_states.update(moves.get((s, symbol), set()))
+
+                if next_states:
+                    new_transitions[(state, symbol)] = next_states
+
+        for (state, symbol), states in new_transitions.copy().items():
+            if state == self.__start:
+                new_transitions[(START, symbol)] = states
+
+        accepting = {state for state in self.__states if not closures[state].isdisjoint(self.__final)}
+
+        if self.__start in accepting:
+            accepting.add(START)
+
+        self.__epsilon_free = FiniteAutomaton(
+            self.__states | {START}, self.__alphabet, new_transitions, START, accepting
+        )
+
+        if self.__stats is not None:
+            self.__epsilon_free.__share_stats(self.__stats, self.__stats_callback)
+            self.__record("remove_epsilon_transitions", began)
+
+        return self.__epsilon_free
+
+    def determinize(self, engine: DeterminizeEngine = "subset") -> FiniteAutomaton[TState, TSymbol]:
+        if self.__type == "dfa":
+            return self
+
+        if engine in self.__deterministic:
+            return self.__deterministic[engine]
+
+        began = time.perf_counter() if self.__stats is not None else 0.0
+
+        if self.__type == "epsilon-nfa":
+            result = self.remove_epsilon_transitions().determinize(engine)
+        elif engine == "subset":
+            result = self.__determinize_subsets()
+        elif engine == "bitset":
+            result = self.__determinize_bitset()
+        else:
+            raise ValueError(f"Unknown determinization engine {repr(engine)}")
+
+        if self.__stats is not None and self.__type != "epsilon-nfa":
+            result.__share_stats(self.__stats, self.__stats_callback)
+            self.__record("determinize", began)
+
+        self.__deterministic[engine] = result
+        return result
+
+    def __determinize_subsets(self) -> FiniteAutomaton[TState, TSymbol]:
+        start = SubsetState(self.__start)
+        states: Set[Union[SubsetState[Union[TState, Symbol]], Symbol]] = {start}
+        subsets: Dict[FrozenSet[Union[TState, Symbol]], SubsetState[Union[TState, Symbol]]] = {
+            frozenset(start.states): start
+        }
+        queue: Deque[SubsetState[Union[TState, Symbol]]] = deque([start])
+        stats = self.__stats
+        transitions: Dict[
+            Tuple[
+                Union[SubsetState[Union[TState, Symbol]], Symbol],
+                Union[TSymbol, Symbol]
+            ],
+            Union[SubsetState[Union[TState, Symbol]], Symbol]
+        ] = {}
+
+        while queue:
+            state = queue.popleft()
+
+            for symbol in self.__alphabet:
+                next_states: Set[Union[TState, Symbol]] = set()
+
+                for s in state:
+                    next_states.update(self.__transitions.get((s, symbol), set()))
+
+                if not next_states:
+                    transitions[(state, symbol)] = EMPTY
+                    states.add(EMPTY)
+                    continue
+
+                key = frozenset(next_states)
+                next_state = subsets.get(key)
+
+                if next_state is None:
+                    next_state = SubsetState(*key)
+                    subsets[key] = next_state
+                    states.add(next_state)
+                    queue.append(next_state)
+
+                    if stats is not None and len(queue) > stats["queue_high_water"]:
+                        stats["queue_high_water"] = len(queue)
+
+                transitions[(state, symbol)] = next_state
+
+        if EMPTY in states:
+            for symbol in self.__alphabet:
                 transitions[(EMPTY, symbol)] = EMPTY
 
+        if stats is not None:
+            stats["subsets_created"] += len(subsets)
+
         accepting = {state for state in states if type(state) is SubsetState and any(s in self.__final for s in state)}
         set_accepting = {state.to_symbol() for state in accepting}
         set_states = {state.to_symbol() if type(state) is SubsetState else state for state in states}
@@ -313,3 +1954,629 @@ class FiniteAutomaton(Generic[TState, TSymbol]):
         }
 
         return FiniteAutomaton(set_states, self.__alphabet, set_transitions, start.to_symbol(), set_accepting)
+
+    def __determinize_bitset(self) -> FiniteAutomaton[TState, TSymbol]:
+        states = list(self.__states)
+        state_ids = {state: i for i, state in enumerate(states)}
+        alphabet = list(self.__alphabet)
+        symbol_ids = {symbol: i for i, symbol in enumerate(alphabet)}
+        successors: List[List[int]] = [[0] * len(states) for _ in alphabet]
+
+        for (state, symbol), new_states in self.__transitions.items():
+            for new_state in new_states:
+                successors[symbol_ids[symbol]][state_ids[state]] |= 1 << state_ids[new_state]
+
+        accepting_mask = 0
+
+        for state in self.__final:
+            accepting_mask |= 1 << state_ids[state]
+
+        start = 1 << state_ids[self.__start]
+        subsets: Dict[int, int] = {start: 0}
+        order: List[int] = [start]
+        rows: List[List[int]] = []
+        stats = self.__stats
+
+        while len(rows) < len(order):
+            subset = order[len(rows)]
+            row: List[int] = []
+
+            for symbol_successors in successors:
+                next_subset = 0
+                remaining = subset
+
+                while remaining:
+                    lowest = remaining & -remaining
+                    next_subset |= symbol_successors[lowest.bit_length() - 1]
+                    remaining ^= lowest
+
+                next_id = subsets.get(next_subset)
+
+                if next_id is None:
+                    next_id = subsets[next_subset] = len(order)
+                    order.append(next_subset)
+
+                    if stats is not None and len(order) - len(rows) - 1 > stats["queue_high_water"]:
+                        stats["queue_high_water"] = len(order) - len(rows) - 1
+
+                row.append(next_id)
+
+            rows.append(row)
+
+        if stats is not None:
+            stats["subsets_created"] += len(order) - (0 in subsets)
+
+        def to_symbol(subset: int) -> Symbol:
+            if not subset:
+                return EMPTY
+
+            return SubsetState(*(state for i, state in enumerate(states) if subset >> i & 1)).to_symbol()
+
+        symbols = [to_symbol(subset) for subset in order]
+        set_transitions = {
+            (symbols[i], symbol): {symbols[row[j]]}
+            for i, row in enumerate(rows)
+            for j, symbol in enumerate(alphabet)
+        }
+        set_accepting = {symbols[i] for i, subset in enumerate(order) if subset & accepting_mask}
+
+        return FiniteAutomaton(set(symbols), self.__alphabet, set_transitions, symbols[0], set_accepting)
+
+    def minimize(self, partial: bool = False) -> FiniteAutomaton[TState, TSymbol]:
+        if self.__type != "dfa" and not (partial and self.__is_deterministic()):
+            return self.determinize().minimize(partial)
+
+        if self.__stats is None:
+            return self.__minimize(partial)
+
+        began = time.perf_counter()
+        result = self.__minimize(partial)
+        self.__record("minimize", began)
+
+        return result
+
+    def __minimize(self, partial: bool) -> FiniteAutomaton[TState, TSymbol]:
+        alphabet = list(self.__alphabet)
+        successors: Dict[Union[TState, Symbol], List[Optional[Union[TState, Symbol]]]] = {}
+
+        for state in self.__states:
+            successors[state] = [next(iter(self.__transitions.get((state, symbol), ())), None) for symbol in alphabet]
+
+        reachable = {self.__start}
+        queue = deque([self.__start])
+
+        while queue:
+            for next_state in successors[queue.popleft()]:
+                if next_state is not None and next_state not in reachable:
+                    reachable.add(next_state)
+                    queue.append(next_state)
+
+        states = [self.__start, *(state for state in reachable if state != self.__start)]
+
+        if partial:
+            predecessors: Dict[Union[TState, Symbol], List[Union[TState, Symbol]]] = {state: [] for state in states}
+
+            for state in states:
+                for next_state in successors[state]:
+                    if next_state is not None:
+                        predecessors[next_state].append(state)
+
+            live = {state for state in states if state in self.__final}
+            queue = deque(live)
+
+            while queue:
+                for previous_state in predecessors[queue.popleft()]:
+                    if previous_state not in live:
+                        live.add(previous_state)
+                        queue.append(previous_state)
+
+            states = [state for state in states if state in live or state == self.__start]
+
+        state_ids = {state: i for i, state in enumerate(states)}
+        inverse: List[List[List[int]]] = [[[] for _ in states] for _ in alphabet]
+
+        for state in states:
+            for j, next_state in enumerate(successors[state]):
+                if next_state in state_ids:
+                    inverse[j][state_ids[next_state]].append(state_ids[state])
+
+        blocks: List[Set[int]] = [
+            block for block in (
+                {i for i, state in enumerate(states) if state in self.__final},
+                {i for i, state in enumerate(states) if state not in self.__final}
+            ) if block
+        ]
+        block_ids = [0] * len(states)
+
+        for i, block in enumerate(blocks):
+            for state_id in block:
+                block_ids[state_id] = i
+
+        pending = {(i, j) for i in range(len(blocks)) for j in range(len(alphabet))}
+        worklist = list(pending)
+
+        while worklist:
+            splitter = worklist.pop()
+            pending.discard(splitter)
+            block_id, symbol_id = splitter
+            touched: Dict[int, List[int]] = {}
+
+            for state_id in blocks[block_id]:
+                for previous_id in inverse[symbol_id][state_id]:
+                    touched.setdefault(block_ids[previous_id], []).append(previous_id)
+
+            for touched_id, members in touched.items():
+                if len(members) == len(blocks[touched_id]):
+                    continue
+
+                new_id = len(blocks)
+                new_block = set(members)
+                blocks.append(new_block)
+                blocks[touched_id] -= new_block
+
+                for state_id in new_block:
+                    block_ids[state_id] = new_id
+
+                for j in range(len(alphabet)):
+                    if (touched_id, j) in pending or len(new_block) <= len(blocks[touched_id]):
+                        splitter = (new_id, j)
+                    else:
+                        splitter = (touched_id, j)
+
+                    pending.add(splitter)
+                    worklist.append(splitter)
+
+        representatives = [states[min(block)] for block in blocks]
+        new_transitions: Dict[Tuple[Union[TState, Symbol], Union[TSymbol, Symbol]], Set[Union[TState, Symbol]]] = {}
+
+        for representative in representatives:
+            for symbol, next_state in zip(alphabet, successors[representative]):
+                if next_state in state_ids:
+                    new_transitions[(representative, symbol)] = {representatives[block_ids[state_ids[next_state]]]}
+
+        return FiniteAutomaton(
+            set(representatives),
+            self.__alphabet,
+            new_transitions,
+            self.__start,
+            {representative for representative in representatives if representative in self.__final}
+        )
+
+    def distinguishing_word(
+            self,
+            other: FiniteAutomaton[TState, TSymbol]
+    ) -> Optional[Tuple[Union[TSymbol, Symbol], ...]]:
+        alphabet = self.__alphabet | other.alphabet
+        parents: Dict[Tuple[int, FrozenSet[Union[TState, Symbol]]], Tuple[int, FrozenSet[Union[TState, Symbol]]]] = {}
+
+        def find(node: Tuple[int, FrozenSet[Union[TState, Symbol]]]) -> Tuple[int, FrozenSet[Union[TState, Symbol]]]:
+            root = node
+
+            while parents.get(root, root) != root:
+                root = parents[root]
+
+            while node != root:
+                parents[node], node = root, parents[node]
+
+            return root
+
+        def step(
+                automaton: FiniteAutomaton[TState, TSymbol],
+                states: FrozenSet[Union[TState, Symbol]],
+                symbol: Union[TSymbol, Symbol]
+        ) -> FrozenSet[Union[TState, Symbol]]:
+            return automaton.step(states, symbol) if symbol in automaton.alphabet else frozenset()
+
+        start = (self.epsilon_closure({self.__start}), other.epsilon_closure({other.start}))
+        parents[(0, start[0])] = (1, start[1])
+        came_from: Dict[
+            Tuple[FrozenSet[Union[TState, Symbol]], FrozenSet[Union[TState, Symbol]]],
+            Optional[Tuple[
+                Tuple[FrozenSet[Union[TState, Symbol]], FrozenSet[Union[TState, Symbol]]],
+                Union[TSymbol, Symbol]
+            ]]
+        ] = {start: None}
+        queue = deque([start])
+
+        while queue:
+            pair = queue.popleft()
+            left, right = pair
+
+            if left.isdisjoint(self.__final) != right.isdisjoint(other.accepting):
+                word: List[Union[TSymbol, Symbol]] = []
+                previous = came_from[pair]
+
+                while previous is not None:
+                    pair, symbol = previous
+                    word.append(symbol)
+                    previous = came_from[pair]
+
+                return tuple(reversed(word))
+
+            for symbol in alphabet:
+                next_pair = (step(self, left, symbol), step(other, right, symbol))
+                left_root = find((0, next_pair[0]))
+                right_root = find((1, next_pair[1]))
+
+                if left_root != right_root:
+                    parents[left_root] = right_root
+                    came_from[next_pair] = (pair, symbol)
+                    queue.append(next_pair)
+
+        return None
+
+    def equivalent(self, other: FiniteAutomaton[TState, TSymbol]) -> bool:
+        return self.distinguishing_word(other) is None
+
+    @staticmethod
+    def __simulation(
+            states: List[Tuple[int, Union[TState, Symbol]]],
+            successors: Dict[
+                Tuple[int, Union[TState, Symbol]],
+                Dict[Union[TSymbol, Symbol], Set[Tuple[int, Union[TState, Symbol]]]]
+            ],
+            final: Set[Tuple[int, Union[TState, Symbol]]]
+    ) -> Dict[Tuple[int, Union[TState, Symbol]], Set[Tuple[int, Union[TState, Symbol]]]]:
+        if len(states) > FiniteAutomaton.__SIMULATION_LIMIT:
+            return {state: {state} for state in states}
+
+        size = len(states)
+        index = {state: i for i, state in enumerate(states)}
+        symbols = list({symbol for state in states for symbol in successors[state]})
+        post = [[[index[s] for s in successors[state].get(symbol, ())] for state in states] for symbol in symbols]
+        pre: List[List[List[int]]] = [[[] for _ in states] for _ in symbols]
+
+        for a, edges in enumerate(post):
+            for i, targets in enumerate(edges):
+                for j in targets:
+                    pre[a][j].append(i)
+
+        enabled = [frozenset(a for a in range(len(symbols)) if post[a][i]) for i in range(size)]
+        accepting = [state in final for state in states]
+        sim = [
+            {j for j in range(size) if (accepting[j] or not accepting[i]) and enabled[i] <= enabled[j]}
+            for i in range(size)
+        ]
+        counts: List[Dict[int, int]] = [{} for _ in symbols]
+        remove: List[List[Set[int]]] = [[set() for _ in states] for _ in symbols]
+        worklist: List[Tuple[int, int]] = []
+
+        for a in range(len(symbols)):
+            movable = [i for i in range(size) if post[a][i]]
+
+            for v in range(size):
+                for j in sim[v]:
+                    for i in pre[a][j]:
+                        counts[a][i * size + v] = counts[a].get(i * size + v, 0) + 1
+
+                remove[a][v] = {i for i in movable if i * size + v not in counts[a]}
+
+                if remove[a][v]:
+                    worklist.append((a, v))
+
+        while worklist:
+            a, v = worklist.pop()
+            removed, remove[a][v] = remove[a][v], set()
+
+            for u in pre[a][v]:
+                for w in removed & sim[u]:
+                    sim[u].discard(w)
+
+                    for b in range(len(symbols)):
+                        for i in pre[b][w]:
+                            counts[b][i * size + u] -= 1
+
+                            if not counts[b][i * size + u]:
+                                if not remove[b][u]:
+                                    worklist.append((b, u))
+
+                                remove[b][u].add(i)
+
+        return {state: {states[j] for j in sim[i]} for i, state in enumerate(states)}
+
+    def issubset(self, other: FiniteAutomaton[TState, TSymbol]) -> bool:
+        left = self.remove_epsilon_transitions()
+        right = other.remove_epsilon_transitions()
+        return left.__includes_in(right)
+
+    def __includes_in(self, other: FiniteAutomaton[TState, TSymbol]) -> bool:
+        automata = (self, other)
+        alphabet = self.__alphabet | other.alphabet
+        states = [(side, state) for side, automaton in enumerate(automata) for state in automaton.states]
+        final = {(side, state) for side, automaton in enumerate(automata) for state in automaton.accepting}
+        successors = {
+            (side, state): {
+                symbol: {(side, next_state) for next_state in automata[side].transitions.get((state, symbol), ())}
+                for symbol in alphabet
+            }
+            for side, state in states
+        }
+        simulating = self.__simulation(states, successors, final)
+        simulated: Dict[Tuple[int, Union[TState, Symbol]], Set[Tuple[int, Union[TState, Symbol]]]] = {
+            state: set() for state in states
+        }
+
+        for state, others in simulating.items():
+            for other_state in others:
+                simulated[other_state].add(state)
+
+        def subsumes(
+                stronger: FrozenSet[Tuple[int, Union[TState, Symbol]]],
+                weaker: FrozenSet[Tuple[int, Union[TState, Symbol]]]
+        ) -> bool:
+            return all(not simulating[state].isdisjoint(weaker) for state in stronger)
+
+        antichain: Dict[Tuple[int, Union[TState, Symbol]], List[FrozenSet[Tuple[int, Union[TState, Symbol]]]]] = {}
+        queue: Deque[Tuple[Tuple[int, Union[TState, Symbol]], FrozenSet[Tuple[int, Union[TState, Symbol]]]]] = deque()
+
+        def add(state: Tuple[int, Union[TState, Symbol]], states: FrozenSet[Tuple[int, Union[TState, Symbol]]]) -> None:
+            if not simulating[state].isdisjoint(states):
+                return
+
+            for stronger in simulating[state]:
+                if any(subsumes(known, states) for known in antichain.get(stronger, ())):
+                    return
+
+            for weaker in simulated[state]:
+                if weaker in antichain:
+                    antichain[weaker] = [known for known in antichain[weaker] if not subsumes(states, known)]
+
+            antichain.setdefault(state, []).append(states)
+            queue.append((state, states))
+
+        add((0, self.__start), frozenset({(1, other.start)}))
+
+        while queue:
+            state, states = queue.popleft()
+
+            if state in final and states.isdisjoint(final):
+                return False
+
+            for symbol in self.__alphabet:
+                frozen = frozenset().union(*(successors[s][symbol] for s in states))
+
+                for next_state in successors[state][symbol]:
+                    add(next_state, frozen)
+
+        return True
+
+    def is_universal(self) -> bool:
+        universal = FiniteAutomaton(
+            {START},
+            self.__alphabet,
+            {(START, symbol): {START} for symbol in self.__alphabet},
+            START,
+            {START}
+        )
+
+        return universal.issubset(self)
+
+    def __product(
+            self,
+            other: FiniteAutomaton[TState, TSymbol],
+            accept: Callable[[bool, bool], bool],
+            complete_left: bool,
+            complete_right: bool
+    ) -> FiniteAutomaton[Tuple[Union[TState, Symbol], Union[TState, Symbol]], TSymbol]:
+        alphabet = self.__alphabet | other.alphabet
+
+        def successors(
+                automaton: FiniteAutomaton[TState, TSymbol],
+                state: Union[TState, Symbol],
+                symbol: Union[TSymbol, Symbol],
+                complete: bool
+        ) -> Set[Union[TState, Symbol]]:
+            next_states = automaton.transitions.get((state, symbol), set())
+            return next_states if next_states or not complete else {EMPTY}
+
+        start = (self.__start, other.start)
+        states = {start}
+        queue = deque([start])
+        transitions: Dict[
+            Tuple[Tuple[Union[TState, Symbol], Union[TState, Symbol]], Union[TSymbol, Symbol]],
+            Set[Tuple[Union[TState, Symbol], Union[TState, Symbol]]]
+        ] = {}
+
+        while queue:
+            pair = queue.popleft()
+            left, right = pair
+
+            for symbol in alphabet:
+                next_pairs = {
+                    (next_left, next_right)
+                    for next_left in successors(self, left, symbol, complete_left)
+                    for next_right in successors(other, right, symbol, complete_right)
+                }
+
+                if not next_pairs:
+                    continue
+
+                transitions[(pair, symbol)] = next_pairs
+
+                for next_pair in next_pairs:
+                    if next_pair not in states:
+                        states.add(next_pair)
+                        queue.append(next_pair)
+
+        accepting = {
+            (left, right) for left, right in states
+            if accept(left in self.__final, right in other.accepting)
+        }
+
+        return FiniteAutomaton(states, alphabet, transitions, start, accepting)
+
+    def __and__(
+            self,
+            other: object
+    ) -> FiniteAutomaton[Tuple[Union[TState, Symbol], Union[TState, Symbol]], TSymbol]:
+        if not isinstance(other, FiniteAutomaton):
+            return NotImplemented
+
+        return self.remove_epsilon_transitions().__product(
+            other.remove_epsilon_transitions(),
+            lambda left, right: left and right,
+            complete_left=False,
+            complete_right=False
+        )
+
+    def __or__(
+            self,
+            other: object
+    ) -> FiniteAutomaton[Tuple[Union[TState, Symbol], Union[TState, Symbol]], TSymbol]:
+        if not isinstance(other, FiniteAutomaton):
+            return NotImplemented
+
+        return self.remove_epsilon_transitions().__product(
+            other.remove_epsilon_transitions(),
+            lambda left, right: left or right,
+            complete_left=True,
+            complete_right=True
+        )
+
+    def __sub__(
+            self,
+            other: object
+    ) -> FiniteAutomaton[Tuple[Union[TState, Symbol], Union[TState, Symbol]], TSymbol]:
+        if not isinstance(other, FiniteAutomaton):
+            return NotImplemented
+
+        return self.remove_epsilon_transitions().__product(
+            other.determinize(),
+            lambda left, right: left and not right,
+            complete_left=False,
+            complete_right=True
+        )
+
+    def __invert__(self) -> FiniteAutomaton[TState, TSymbol]:
+        dfa = self.determinize()
+        return FiniteAutomaton(
+            set(dfa.states), dfa.alphabet, dict(dfa.transitions), dfa.start, dfa.states - dfa.accepting
+        )
+
+
+@final
+class LazyDFA(Generic[TState, TSymbol]):
+    def __init__(
+            self,
+            automaton: FiniteAutomaton[TState, TSymbol],
+            max_states: int = 10000,
+            max_flushes: int = 8
+    ) -> None:
+        if max_states < 1:
+            raise ValueError("The state cache must be able to hold at least one state")
+
+        if max_flushes < 0:
+            raise ValueError("The number of cache flushes must not be negative")
+
+        self.__automaton = automaton
+        self.__max_states = max_states
+        self.__max_flushes = max_flushes
+        self.__start = automaton.epsilon_closure({automaton.start})
+        self.__subsets: Dict[FrozenSet[Union[TState, Symbol]], int] = {}
+        self.__states: List[FrozenSet[Union[TState, Symbol]]] = []
+        self.__accepting: List[bool] = []
+        self.__transitions: Dict[Tuple[int, Union[TSymbol, Symbol]], int] = {}
+        self.__hits = 0
+        self.__misses = 0
+        self.__flushes = 0
+        self.__fallbacks = 0
+
+    @property
+    def automaton(self) -> FiniteAutomaton[TState, TSymbol]:
+        return self.__automaton
+
+    @property
+    def size(self) -> int:
+        return len(self.__states)
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def flushes(self) -> int:
+        return self.__flushes
+
+    @property
+    def fallbacks(self) -> int:
+        return self.__fallbacks
+
+    def __intern(self, subset: FrozenSet[Union[TState, Symbol]]) -> int:
+        state = self.__subsets.get(subset)
+
+        if state is None:
+            if len(self.__states) >= self.__max_states:
+                self.flush()
+                self.__flushes += 1
+
+            state = self.__subsets[subset] = len(self.__states)
+            self.__states.append(subset)
+            self.__accepting.append(not subset.isdisjoint(self.__automaton.accepting))
+
+        return state
+
+    def flush(self) -> None:
+        self.__subsets.clear()
+        self.__states.clear()
+        self.__accepting.clear()
+        self.__transitions.clear()
+
+    def accepts(self, word: Iterable[Union[TSymbol, Symbol]]) -> bool:
+        transitions = self.__transitions
+        state = self.__intern(self.__start)
+        flushes = self.__flushes
+        symbols = iter(word)
+
+        for symbol in symbols:
+            next_state = transitions.get((state, symbol))
+
+            if next_state is not None:
+                self.__hits += 1
+                state = next_state
+                continue
+
+            self.__misses += 1
+            subset = self.__automaton.step(self.__states[state], symbol)
+            last_flushes = self.__flushes
+            next_state = self.__intern(subset)
+
+            if self.__flushes == last_flushes:
+                transitions[(state, symbol)] = next_state
+            elif self.__flushes - flushes > self.__max_flushes:
+                self.__fallbacks += 1
+                *_, last_states = self.__automaton.simulate_from(subset, symbols)
+                return not last_states.isdisjoint(self.__automaton.accepting)
+
+            state = next_state
+
+        return self.__accepting[state]
+
+    def __repr__(self) -> str:
+        props = [
+            f"automaton={repr(self.__automaton)}",
+            f"max_states={self.__max_states}",
+            f"max_flushes={self.__max_flushes}"
+        ]
+
+        return f"{self.__class__.__name__}({', '.join(props)})"
+
+
+@lru_cache(maxsize=256)
+def _compile_regex(
+        pattern: str,
+        alphabet: Optional[FrozenSet[str]],
+        construction: RegexConstruction
+) -> CompiledDFA[object, str]:
+    return FiniteAutomaton.from_regex(pattern, alphabet, construction).minimize(partial=True).compile()
+
+
+def compile_regex(
+        pattern: str,
+        alphabet: Optional[AbstractSet[str]] = None,
+        construction: RegexConstruction = "glushkov"
+) -> CompiledDFA[object, str]:
+    return _compile_regex(pattern, None if alphabet is None else frozenset(alphabet), construction)
@@ -1,6 +1,15 @@
+import itertools
+import pathlib
+import pickle
+import re
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+
+import pytest
 from hypothesis import given, strategies as st
 
-from main import FiniteAutomaton, Language, EPSILON
+from main import FiniteAutomaton, CompiledDFA, Language, LazyDFA, AcceptanceMemo, Match, Symbol, EPSILON, compile_regex
 
 
 def test_type_dfa() -> None:
@@ -131,3 +140,1088 @@ def test_epsilon_nfa() -> None:
     assert "b" not in Language(epsilon_nfa.determinize())
     assert "abab" in Language(epsilon_nfa.determinize())
     assert "ab" * 100 in Language(epsilon_nfa.determinize())
+
+
+@given(st.text({'a', 'b'}))
+def test_compiled_dfa(word: str) -> None:
+    dfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (0, 'b'): {0},
+            (1, 'a'): {0},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={0}
+    )
+
+    compiled = dfa.compile()
+
+    assert compiled.accepts(word) == dfa.accepts(word)
+    assert compiled.states[compiled.run(word)] == list(dfa.compute(word))[-1]
+
+
+def test_compiled_epsilon_nfa() -> None:
+    epsilon_nfa = FiniteAutomaton(
+        states={0, 1, 2},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (1, 'b'): {2},
+            (2, EPSILON): {0}
+        },
+        start=0,
+        accepting={2}
+    )
+
+    compiled = epsilon_nfa.compile()
+
+    assert compiled.accepts("abab")
+    assert not compiled.accepts("aba")
+    assert not compiled.accepts("")
+
+    with pytest.raises(ValueError):
+        compiled.accepts("abc")
+
+
+def test_compiled_partial_dfa() -> None:
+    partial = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (1, 'b'): {0}
+        },
+        start=0,
+        accepting={0}
+    )
+
+    compiled = partial.compile()
+
+    assert len(compiled.states) == 3
+    assert compiled.accepts("abab")
+    assert not compiled.accepts("abb")
+
+
+def test_determinize_cached() -> None:
+    epsilon_nfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a'},
+        transitions={
+            (0, EPSILON): {1},
+            (1, 'a'): {0, 1}
+        },
+        start=0,
+        accepting={1}
+    )
+
+    assert epsilon_nfa.remove_epsilon_transitions() is epsilon_nfa.remove_epsilon_transitions()
+    assert epsilon_nfa.determinize() is epsilon_nfa.determinize()
+    assert epsilon_nfa.determinize() is epsilon_nfa.remove_epsilon_transitions().determinize()
+    assert "aaa" in Language(epsilon_nfa)
+
+
+@given(
+    st.sets(st.tuples(st.integers(0, 4), st.sampled_from('ab'), st.integers(0, 4))),
+    st.sets(st.integers(0, 4)),
+    st.text({'a', 'b'}, max_size=8)
+)
+def test_determinize_random_nfa(edges: Set[Tuple[int, str, int]], accepting: Set[int], word: str) -> None:
+    transitions: Dict[Tuple[int, str], Set[int]] = {}
+
+    for state, symbol, new_state in edges:
+        transitions.setdefault((state, symbol), set()).add(new_state)
+
+    nfa = FiniteAutomaton(set(range(5)), {'a', 'b'}, transitions, 0, accepting)
+
+    current = {0}
+
+    for symbol in word:
+        current = {new_state for state in current for new_state in transitions.get((state, symbol), set())}
+
+    assert nfa.determinize().accepts(word) == bool(current & accepting)
+    assert nfa.determinize(engine="bitset").accepts(word) == bool(current & accepting)
+    assert len(nfa.determinize(engine="bitset").states) == len(nfa.determinize().states)
+
+
+def test_epsilon_closure() -> None:
+    epsilon_nfa = FiniteAutomaton(
+        states={0, 1, 2, 3, 4},
+        alphabet={'a'},
+        transitions={
+            (0, EPSILON): {1},
+            (1, EPSILON): {2},
+            (2, EPSILON): {1, 3},
+            (3, 'a'): {4}
+        },
+        start=0,
+        accepting={3}
+    )
+
+    assert epsilon_nfa.epsilon_closure({0}) == {0, 1, 2, 3}
+    assert epsilon_nfa.epsilon_closure({2}) == {1, 2, 3}
+    assert epsilon_nfa.epsilon_closure({3, 4}) == {3, 4}
+    assert epsilon_nfa.epsilon_closure(set()) == set()
+    assert "" in Language(epsilon_nfa)
+    assert "a" not in Language(epsilon_nfa)
+
+
+@given(
+    st.sets(st.tuples(st.integers(0, 4), st.sampled_from(['a', 'b', EPSILON]), st.integers(0, 4))),
+    st.sets(st.integers(0, 4)),
+    st.text({'a', 'b'}, max_size=8)
+)
+def test_remove_epsilon_transitions_random(
+        edges: Set[Tuple[int, object, int]],
+        accepting: Set[int],
+        word: str
+) -> None:
+    transitions: Dict[Tuple[int, object], Set[int]] = {}
+
+    for state, symbol, new_state in edges:
+        transitions.setdefault((state, symbol), set()).add(new_state)
+
+    epsilon_nfa = FiniteAutomaton(set(range(5)), {'a', 'b'}, transitions, 0, accepting)
+
+    def closure(states: Set[int]) -> Set[int]:
+        result = set(states)
+
+        while True:
+            new = {t for s in result for t in transitions.get((s, EPSILON), set())} - result
+
+            if not new:
+                return result
+
+            result |= new
+
+    current = closure({0})
+
+    for symbol in word:
+        current = closure({t for s in current for t in transitions.get((s, symbol), set())})
+
+    assert epsilon_nfa.remove_epsilon_transitions().determinize().accepts(word) == bool(current & accepting)
+
+
+def test_simulate_without_determinization() -> None:
+    n = 20
+    # (a|b)*a(a|b){n}: the equivalent DFA has 2^(n + 1) states
+    nfa = FiniteAutomaton(
+        states=set(range(n + 2)),
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {0, 1},
+            (0, 'b'): {0},
+            **{(i, symbol): {i + 1} for i in range(1, n + 1) for symbol in 'ab'}
+        },
+        start=0,
+        accepting={n + 1}
+    )
+
+    assert nfa.accepts("b" + "a" + "b" * n, engine="nfa")
+    assert not nfa.accepts("a" + "b" * n + "b", engine="nfa")
+    assert list(nfa.compute("ab", engine="nfa")) == [{0}, {0, 1}, {0, 2}]
+
+    with pytest.raises(ValueError):
+        nfa.accepts("abc", engine="nfa")
+
+
+@given(st.text({'a', 'b'}, max_size=10))
+def test_simulate_epsilon_nfa(word: str) -> None:
+    epsilon_nfa = FiniteAutomaton(
+        states={0, 1, 2},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (1, 'b'): {2},
+            (2, EPSILON): {0}
+        },
+        start=0,
+        accepting={2}
+    )
+
+    assert epsilon_nfa.accepts(word, engine="nfa") == epsilon_nfa.accepts(word)
+
+
+@given(st.lists(st.text({'a', 'b'}, max_size=12), max_size=10), st.integers(1, 6))
+def test_lazy_dfa(words: List[str], max_states: int) -> None:
+    n = 4
+    nfa = FiniteAutomaton(
+        states=set(range(n + 2)),
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {0, 1},
+            (0, 'b'): {0},
+            **{(i, symbol): {i + 1} for i in range(1, n + 1) for symbol in 'ab'}
+        },
+        start=0,
+        accepting={n + 1}
+    )
+
+    lazy = LazyDFA(nfa, max_states=max_states, max_flushes=2)
+
+    for word in words:
+        assert lazy.accepts(word) == nfa.accepts(word, engine="nfa")
+
+    assert lazy.size <= max_states
+    assert lazy.hits + lazy.misses <= sum(map(len, words))
+
+
+def test_lazy_dfa_cache() -> None:
+    nfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {0, 1},
+            (0, 'b'): {0},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={1}
+    )
+
+    lazy = LazyDFA(nfa)
+
+    assert lazy.accepts("abab")
+    assert lazy.misses == 3
+    assert lazy.accepts("abab")
+    assert lazy.hits == 5
+    assert lazy.flushes == 0 and lazy.fallbacks == 0
+
+
+def test_minimize() -> None:
+    # dfa that accepts strings with an even number of 'a's, with every state duplicated
+    dfa = FiniteAutomaton(
+        states={0, 1, 2, 3, 4},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (0, 'b'): {2},
+            (1, 'a'): {2},
+            (1, 'b'): {3},
+            (2, 'a'): {3},
+            (2, 'b'): {0},
+            (3, 'a'): {0},
+            (3, 'b'): {1},
+            (4, 'a'): {4},
+            (4, 'b'): {4}
+        },
+        start=0,
+        accepting={0, 2}
+    )
+
+    minimal = dfa.minimize()
+
+    assert minimal.type == "dfa"
+    assert minimal.start == 0
+    assert len(minimal.states) == 2
+    assert "abab" in Language(minimal)
+    assert "aab" in Language(minimal)
+    assert "ab" not in Language(minimal)
+
+
+@given(
+    st.sets(st.tuples(st.integers(0, 4), st.sampled_from('ab'), st.integers(0, 4))),
+    st.sets(st.integers(0, 4)),
+    st.text({'a', 'b'}, max_size=8)
+)
+def test_minimize_random_nfa(edges: Set[Tuple[int, str, int]], accepting: Set[int], word: str) -> None:
+    transitions: Dict[Tuple[int, str], Set[int]] = {}
+
+    for state, symbol, new_state in edges:
+        transitions.setdefault((state, symbol), set()).add(new_state)
+
+    nfa = FiniteAutomaton(set(range(5)), {'a', 'b'}, transitions, 0, accepting)
+    minimal = nfa.minimize()
+    partial = nfa.minimize(partial=True)
+
+    assert minimal.accepts(word) == nfa.accepts(word)
+    assert partial.compile().accepts(word) == nfa.accepts(word)
+    assert len(minimal.minimize().states) == len(minimal.states)
+    assert len(partial.states) <= len(minimal.states) <= len(nfa.determinize().states)
+    assert len(partial.states) >= len(minimal.states) - 1
+
+
+def test_equivalent() -> None:
+    dfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (0, 'b'): {0},
+            (1, 'a'): {0},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={0}
+    )
+
+    epsilon_nfa = FiniteAutomaton(
+        states={0, 1, 2},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'b'): {0},
+            (0, 'a'): {1},
+            (1, 'b'): {1},
+            (1, 'a'): {2},
+            (2, EPSILON): {0}
+        },
+        start=0,
+        accepting={0}
+    )
+
+    odd = FiniteAutomaton(dfa.states, dfa.alphabet, dfa.transitions, 0, {1})
+
+    assert dfa.equivalent(epsilon_nfa)
+    assert Language(dfa) == Language(epsilon_nfa)
+    assert Language(dfa) != Language(odd)
+    assert hash(Language(dfa)) == hash(Language(epsilon_nfa))
+    assert {Language(dfa), Language(epsilon_nfa), Language(odd)} == {Language(dfa), Language(odd)}
+    assert dfa.distinguishing_word(epsilon_nfa) is None
+    assert dfa.distinguishing_word(odd) == ()
+    assert dfa.distinguishing_word(dfa.minimize()) is None
+
+
+@given(
+    st.sets(st.tuples(st.integers(0, 3), st.sampled_from('ab'), st.integers(0, 3))),
+    st.sets(st.integers(0, 3)),
+    st.sets(st.tuples(st.integers(0, 3), st.sampled_from('ab'), st.integers(0, 3))),
+    st.sets(st.integers(0, 3))
+)
+def test_distinguishing_word_random(
+        edges1: Set[Tuple[int, str, int]],
+        accepting1: Set[int],
+        edges2: Set[Tuple[int, str, int]],
+        accepting2: Set[int]
+) -> None:
+    automata = []
+
+    for edges, accepting in ((edges1, accepting1), (edges2, accepting2)):
+        transitions: Dict[Tuple[int, str], Set[int]] = {}
+
+        for state, symbol, new_state in edges:
+            transitions.setdefault((state, symbol), set()).add(new_state)
+
+        automata.append(FiniteAutomaton(set(range(4)), {'a', 'b'}, transitions, 0, accepting))
+
+    first, second = automata
+    word = first.distinguishing_word(second)
+    words = [''.join(letters) for n in range(7) for letters in itertools.product('ab', repeat=n)]
+    differences = [w for w in words if first.accepts(w) != second.accepts(w)]
+
+    if word is None:
+        assert not differences
+    else:
+        assert first.accepts(word) != second.accepts(word)
+        assert not differences or len(word) == len(differences[0])
+
+
+def test_issubset() -> None:
+    a_then_anything = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (1, 'a'): {1},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={1}
+    )
+
+    contains_a = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {0, 1},
+            (0, 'b'): {0},
+            (1, 'a'): {1},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={1}
+    )
+
+    assert Language(a_then_anything) <= Language(contains_a)
+    assert not Language(contains_a) <= Language(a_then_anything)
+    assert Language(contains_a) >= Language(a_then_anything)
+    assert not contains_a.is_universal()
+
+    anything = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, EPSILON): {1},
+            (0, 'a'): {0},
+            (1, 'b'): {0}
+        },
+        start=0,
+        accepting={1}
+    )
+
+    assert Language(anything).is_universal()
+
+
+@given(
+    st.sets(st.tuples(st.integers(0, 3), st.sampled_from('ab'), st.integers(0, 3))),
+    st.sets(st.integers(0, 3)),
+    st.sets(st.tuples(st.integers(0, 3), st.sampled_from('ab'), st.integers(0, 3))),
+    st.sets(st.integers(0, 3))
+)
+def test_issubset_random(
+        edges1: Set[Tuple[int, str, int]],
+        accepting1: Set[int],
+        edges2: Set[Tuple[int, str, int]],
+        accepting2: Set[int]
+) -> None:
+    automata = []
+
+    for edges, accepting in ((edges1, accepting1), (edges2, accepting2)):
+        transitions: Dict[Tuple[int, str], Set[int]] = {}
+
+        for state, symbol, new_state in edges:
+            transitions.setdefault((state, symbol), set()).add(new_state)
+
+        automata.append(FiniteAutomaton(set(range(4)), {'a', 'b'}, transitions, 0, accepting))
+
+    first, second = automata
+    pairs = {(frozenset({0}), frozenset({0}))}
+    queue = list(pairs)
+
+    while queue:
+        left, right = queue.pop()
+
+        for symbol in 'ab':
+            pair = (
+                frozenset(t for s in left for t in first.transitions.get((s, symbol), set())),
+                frozenset(t for s in right for t in second.transitions.get((s, symbol), set()))
+            )
+
+            if pair not in pairs:
+                pairs.add(pair)
+                queue.append(pair)
+
+    assert first.issubset(second) == all(right & accepting2 for left, right in pairs if left & accepting1)
+    assert first.is_universal() == all(left & accepting1 for left, _ in pairs)
+
+
+@given(
+    st.sets(st.tuples(st.integers(0, 3), st.sampled_from(['a', 'b', EPSILON]), st.integers(0, 3))),
+    st.sets(st.integers(0, 3)),
+    st.sets(st.tuples(st.integers(0, 3), st.sampled_from('bc'), st.integers(0, 3))),
+    st.sets(st.integers(0, 3)),
+    st.text('ab', max_size=6)
+)
+def test_boolean_operations(
+        edges1: Set[Tuple[int, object, int]],
+        accepting1: Set[int],
+        edges2: Set[Tuple[int, str, int]],
+        accepting2: Set[int],
+        word: str
+) -> None:
+    automata = []
+
+    for edges, accepting, alphabet in ((edges1, accepting1, {'a', 'b'}), (edges2, accepting2, {'b', 'c'})):
+        transitions: Dict[Tuple[int, object], Set[int]] = {}
+
+        for state, symbol, new_state in edges:
+            transitions.setdefault((state, symbol), set()).add(new_state)
+
+        automata.append(FiniteAutomaton(set(range(4)), alphabet, transitions, 0, accepting))
+
+    first, second = automata
+    in_first = first.accepts(word, engine="nfa")
+    in_second = 'a' not in word and second.accepts(word, engine="nfa")
+
+    assert (first & second).accepts(word, engine="nfa") == (in_first and in_second)
+    assert (first | second).accepts(word, engine="nfa") == (in_first or in_second)
+    assert (first - second).accepts(word, engine="nfa") == (in_first and not in_second)
+    assert (~first).accepts(word) == (not in_first)
+
+
+def test_acceptance_memo() -> None:
+    dfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (0, 'b'): {0},
+            (1, 'a'): {0},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={0}
+    )
+
+    dfa.memo = AcceptanceMemo(maxsize=2)
+
+    assert dfa.accepts(['a', 'a'])
+    assert dfa.accepts(('a', 'a'))
+    assert not dfa.accepts("ab")
+    assert dfa.accepts(iter("aa"))
+    assert (dfa.memo.hits, dfa.memo.misses, dfa.memo.currsize) == (1, 2, 2)
+
+    dfa.accepts("b")
+
+    assert dfa.memo.currsize == 2
+    assert dfa.memo.get(('a', 'a')) is None
+    assert dfa.memo.get("ab") is False
+
+    with pytest.raises(ValueError, match="Unknown computation engine"):
+        dfa.accepts("ab", engine="bogus")  # type: ignore[arg-type]
+
+    with pytest.raises(ValueError, match="only supported by the dfa engine"):
+        dfa.accepts("ab", engine="nfa", workers=2)
+
+
+def test_acceptance_memo_lfu() -> None:
+    memo = AcceptanceMemo(maxsize=2, policy="lfu")
+
+    memo.put("a", True)
+    memo.put("b", False)
+    memo.get("a")
+    memo.get("a")
+    memo.get("b")
+    memo.put("c", True)
+
+    assert memo.get("a") is True
+    assert memo.get("b") is None
+    assert memo.get("c") is True
+
+
+def test_acceptance_memo_budget() -> None:
+    memo = AcceptanceMemo(maxsize=None, max_bytes=200, digest_threshold=100)
+    key = memo.key("a" * 1000)
+
+    memo.put(key, True)
+    memo.put("b" * 10, False)
+
+    assert memo.get(key) is True
+    assert key != memo.key(b"a" * 1000)
+    assert memo.nbytes <= 200
+
+    memo.put("c" * 500, True)
+
+    assert memo.get("c" * 500) is None
+    assert memo.currsize == 2
+
+
+def test_acceptance_memo_defaults() -> None:
+    memo = AcceptanceMemo()
+    word = ['a', 'b'] * 500_000
+
+    assert memo.key(word) is None
+    assert memo.key(tuple(word[:10])) == tuple(word[:10])
+    assert memo.key("a" * 10_000) != "a" * 10_000
+    assert memo.key("a" * 10_000_000) is None
+    assert memo.key(b"a" * 10_000_000) is None
+
+    memo.put(memo.key(tuple(word[:10])), True)
+    assert memo.nbytes >= sum(sys.getsizeof(symbol) for symbol in word[:10])
+
+    for i in range(1000):
+        memo.put(str(i) * 200, True)
+
+    assert memo.nbytes <= 1 << 20
+
+
+@given(st.lists(st.text({'a', 'b'}, max_size=10)))
+def test_accepts_many(words: List[str]) -> None:
+    # dfa that accepts strings with an even number of 'a's
+    dfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (0, 'b'): {0},
+            (1, 'a'): {0},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={0}
+    )
+
+    expected = [word.count('a') % 2 == 0 for word in words]
+
+    assert dfa.accepts_many(words) == expected
+    assert dfa.accepts_many(map(list, words)) == expected
+    assert Language(dfa).filter(words) == [word for word in words if word.count('a') % 2 == 0]
+
+
+def test_accepts_many_illegal_symbol() -> None:
+    nfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {0, 1},
+            (0, 'b'): {0}
+        },
+        start=0,
+        accepting={1}
+    )
+
+    assert nfa.accepts_many(["", "ba", "ab", "bba"]) == [False, True, False, True]
+
+    with pytest.raises(ValueError):
+        nfa.accepts_many(["ab", "abc"])
+
+    with pytest.raises(ValueError):
+        nfa.accepts_many([['a'], ['c']])
+
+
+@given(st.lists(st.text({'a', 'b'}, max_size=5), max_size=5))
+def test_runner(chunks: List[str]) -> None:
+    epsilon_nfa = FiniteAutomaton(
+        states={0, 1, 2},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (1, 'b'): {2},
+            (2, EPSILON): {0}
+        },
+        start=0,
+        accepting={2}
+    )
+
+    runner = epsilon_nfa.runner()
+
+    for chunk in chunks:
+        runner.feed(chunk)
+        runner = pickle.loads(pickle.dumps(runner))
+
+    assert runner.result() == runner.accepting == epsilon_nfa.accepts(''.join(chunks))
+
+    runner.reset()
+
+    assert not runner.accepting
+
+
+@given(st.text({'a', 'b'}, max_size=20))
+def test_run_and_trace(word: str) -> None:
+    nfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {0, 1},
+            (0, 'b'): {0},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={1}
+    )
+
+    compiled = nfa.compile()
+    trace = nfa.trace(word)
+
+    assert len(trace) == len(word) + 1
+    assert [compiled.states[state] for state in trace] == list(nfa.compute(word))
+    assert nfa.run(word) == compiled.states[trace[-1]]
+    assert nfa.accepts(word) == (trace[-1] in compiled.accepting)
+
+
+def test_accepts_long_word() -> None:
+    dfa = FiniteAutomaton(
+        states={0},
+        alphabet={'a'},
+        transitions={
+            (0, 'a'): {0}
+        },
+        start=0,
+        accepting={0}
+    )
+
+    assert dfa.accepts(itertools.repeat('a', 10 ** 6))
+
+
+def test_search() -> None:
+    # a(b|c)*d?
+    epsilon_nfa = FiniteAutomaton(
+        states={0, 1, 2},
+        alphabet={'a', 'b', 'c', 'd'},
+        transitions={
+            (0, 'a'): {1},
+            (1, 'b'): {1},
+            (1, 'c'): {1},
+            (1, EPSILON): {2},
+            (2, 'd'): {2}
+        },
+        start=0,
+        accepting={2}
+    )
+
+    assert epsilon_nfa.search("xxabcbdd yad") == Match(2, 8)
+    assert epsilon_nfa.match("xxabcbdd yad") is None
+    assert epsilon_nfa.match("abcbdd yad") == Match(0, 6)
+    assert list(epsilon_nfa.finditer("xxabcbdd yad")) == [Match(2, 8), Match(10, 12)]
+    assert epsilon_nfa.search("bcd") is None
+
+
+@given(st.text('abx', max_size=12))
+def test_finditer_matches_re(text: str) -> None:
+    # (ab|b)*a?
+    nfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (0, 'b'): {0},
+            (1, 'b'): {0}
+        },
+        start=0,
+        accepting={0, 1}
+    )
+
+    expected = []
+    position = 0
+
+    while position <= len(text):
+        candidates = [
+            (start, end)
+            for start in range(position, len(text) + 1)
+            for end in range(start, len(text) + 1)
+            if re.fullmatch("(ab|b)*a?", text[start:end])
+        ]
+
+        if not candidates:
+            break
+
+        start = min(candidates)[0]
+        end = max(end for s, end in candidates if s == start)
+        expected.append(Match(start, end))
+        position = end if end > start else end + 1
+
+    assert list(nfa.finditer(text)) == expected
+
+
+@given(st.binary(max_size=12))
+def test_bytes(data: bytes) -> None:
+    # dfa that accepts strings with an even number of 'a's
+    dfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (0, 'b'): {0},
+            (1, 'a'): {0},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={0}
+    )
+
+    text = data.decode("latin-1")
+
+    if set(text) <= {'a', 'b'}:
+        assert dfa.accepts(data) == dfa.accepts(bytearray(data)) == dfa.accepts(memoryview(data)) == dfa.accepts(text)
+    else:
+        with pytest.raises(ValueError):
+            dfa.accepts(data)
+
+    assert list(dfa.finditer(data)) == list(dfa.finditer(text))
+    assert dfa.match(data) == dfa.match(text)
+
+
+def test_match_file(tmp_path: pathlib.Path) -> None:
+    nfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={ord('a'), ord('b')},
+        transitions={
+            (0, ord('a')): {0, 1},
+            (0, ord('b')): {0}
+        },
+        start=0,
+        accepting={1}
+    )
+
+    path = tmp_path / "input"
+    path.write_bytes(b"ab" * 10000 + b"a")
+
+    assert nfa.match_file(path)
+
+    path.write_bytes(b"")
+
+    assert not nfa.match_file(path)
+
+    path.write_bytes(b"abc")
+
+    with pytest.raises(ValueError):
+        nfa.match_file(path)
+
+
+@given(st.text({'a', 'b'}, max_size=20))
+def test_transfer(word: str) -> None:
+    nfa = FiniteAutomaton(
+        states={0, 1, 2},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {0, 1},
+            (0, 'b'): {0},
+            (1, 'b'): {2},
+            (2, 'a'): {2}
+        },
+        start=0,
+        accepting={2}
+    )
+
+    compiled = nfa.compile()
+
+    assert compiled.transfer(word) == [compiled.run_from(state, word) for state in range(len(compiled.states))]
+    assert compiled.transfer(word.encode()) == compiled.transfer(word)
+
+
+def test_accepts_parallel() -> None:
+    # dfa that accepts strings with an even number of 'a's
+    dfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (0, 'b'): {0},
+            (1, 'a'): {0},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={0}
+    )
+
+    word = "ab" * 5000 + "a"
+
+    assert dfa.accepts(word, workers=3) == dfa.accepts(word) is False
+    assert dfa.compile().accepts(word.encode() + b"a", workers=2)
+    assert dfa.compile().accepts(iter(word + "a"), workers=2)
+
+    with pytest.raises(ValueError):
+        dfa.compile().accepts(word + "c", workers=2)
+
+
+def test_accepts_parallel_buffers(tmp_path: pathlib.Path) -> None:
+    # dfa that accepts strings with an even number of 'a's
+    dfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (0, 'b'): {0},
+            (1, 'a'): {0},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={0}
+    )
+    data = b"ab" * 5000 + b"a"
+    (tmp_path / "word.txt").write_bytes(data)
+    (tmp_path / "empty.txt").write_bytes(b"")
+
+    assert dfa.compile().accepts("", workers=2)
+    assert dfa.compile().accepts(b"", workers=2)
+    assert dfa.compile().accepts(memoryview(data + b"a"), workers=2)
+    assert not dfa.compile().accepts(memoryview(data), workers=3)
+    assert not dfa.match_file(tmp_path / "word.txt", workers=2)
+    assert dfa.match_file(tmp_path / "empty.txt", workers=2)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_classify_parallel(ordered: bool) -> None:
+    # dfa that accepts strings with an even number of 'a's
+    dfa = FiniteAutomaton(
+        states={0, 1},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, 'a'): {1},
+            (0, 'b'): {0},
+            (1, 'a'): {0},
+            (1, 'b'): {1}
+        },
+        start=0,
+        accepting={0}
+    )
+
+    words = [''.join(letters) for n in range(10) for letters in itertools.product('ab', repeat=n)]
+    results = list(Language(dfa).classify_parallel(iter(words), processes=2, chunksize=50, ordered=ordered))
+
+    if ordered:
+        assert [word for word, _ in results] == words
+    else:
+        assert sorted(word for word, _ in results) == sorted(words)
+
+    assert all(accepted == (word.count('a') % 2 == 0) for word, accepted in results)
+
+
+@pytest.mark.parametrize("construction", ["thompson", "glushkov"])
+@pytest.mark.parametrize("pattern", [
+    r"(a|b)*a(a|b){2}", r"a+b?c*", r"(ab|c)*|a{1,3}", r"[a-c]b[^ab]", r".a|", r"(?s).", r""
+])
+def test_from_regex(pattern: str, construction: str) -> None:
+    alphabet = {'a', 'b', 'c', '\n'}
+    fa = FiniteAutomaton.from_regex(pattern, alphabet, construction)  # type: ignore[arg-type]
+    dfa = compile_regex(pattern, alphabet, construction)  # type: ignore[arg-type]
+
+    if construction == "glushkov":
+        assert fa.type != "epsilon-nfa"
+
+    for n in range(6):
+        for letters in itertools.product(sorted(alphabet), repeat=n):
+            word = ''.join(letters)
+            expected = re.fullmatch(pattern, word) is not None
+            assert fa.accepts(word) == dfa.accepts(word) == expected
+
+
+def test_from_regex_errors() -> None:
+    assert FiniteAutomaton.from_regex("ab*").alphabet == {'a', 'b'}
+    assert compile_regex("ab*") is compile_regex("ab*")
+
+    for pattern in [r"^a", r"(a)\1", r"(?=a)a", r"[^a]", r"(?i)a", r"", r"()*"]:
+        with pytest.raises(ValueError):
+            FiniteAutomaton.from_regex(pattern)
+
+    for pattern in [r"a", r"b|a", r"[ab]"]:
+        with pytest.raises(ValueError, match="not in the alphabet"):
+            FiniteAutomaton.from_regex(pattern, {'b'})
+
+    negated = FiniteAutomaton.from_regex(r"[^xy][^xa]", {'a', 'b'})
+    assert negated.accepts("ab") and negated.accepts("bb")
+    assert not negated.accepts("aa") and not negated.accepts("b")
+
+    with pytest.raises(ValueError):
+        FiniteAutomaton.from_regex("a", construction="unknown")  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_compiled_save_load(tmp_path: pathlib.Path, use_mmap: bool) -> None:
+    dfa = compile_regex(r"(a|b)*a(a|b){3}")
+    dfa.save(tmp_path / "dfa.bin")
+    loaded = CompiledDFA.load(tmp_path / "dfa.bin", mmap=use_mmap)
+
+    assert loaded.alphabet == dfa.alphabet
+    assert loaded.start == dfa.start
+    assert loaded.accepting == dfa.accepting
+    assert list(loaded.table) == list(dfa.table)
+
+    words = [''.join(letters) for n in range(8) for letters in itertools.product('ab', repeat=n)]
+    assert [loaded.accepts(word) for word in words] == [dfa.accepts(word) for word in words]
+    assert pickle.loads(pickle.dumps(loaded)).accepts("baabb")
+
+    (tmp_path / "bad.bin").write_bytes(b"not an automaton")
+
+    with pytest.raises(ValueError):
+        CompiledDFA.load(tmp_path / "bad.bin", mmap=use_mmap)
+
+
+def test_symbol_interning() -> None:
+    enfa = FiniteAutomaton.from_regex(r"(a|b)*ab")
+    copy = pickle.loads(pickle.dumps(enfa))
+
+    assert pickle.loads(pickle.dumps(EPSILON)) is EPSILON
+    assert Symbol("x") is Symbol("x") and pickle.loads(pickle.dumps(Symbol("x"))) is Symbol("x")
+    assert Symbol("ε") is not EPSILON and pickle.loads(pickle.dumps(Symbol("ε"))) is Symbol("ε")
+    assert copy.type == enfa.type == "epsilon-nfa"
+    assert copy.accepts("bab") and not copy.accepts("ba")
+
+    dfa = pickle.loads(pickle.dumps(enfa.determinize()))
+    assert dfa.start is enfa.determinize().start
+    assert dfa.equivalent(enfa)
+
+
+@pytest.mark.parametrize("label", ["start", "empty", "scan", "ε"])
+def test_symbol_sentinel_collision(label: str) -> None:
+    state = Symbol(label)
+    enfa = FiniteAutomaton(
+        states={0, state},
+        alphabet={'a', 'b'},
+        transitions={
+            (0, EPSILON): {0},
+            (0, 'a'): {state},
+            (state, 'b'): {state}
+        },
+        start=0,
+        accepting={state}
+    )
+
+    assert not enfa.accepts("") and not enfa.accepts("b")
+    assert enfa.accepts("a") and enfa.accepts("abb")
+    assert list(enfa.finditer("bab")) == [Match(1, 3)]
+
+
+def test_codegen(tmp_path: pathlib.Path) -> None:
+    fa = FiniteAutomaton.from_regex(r"(a|b)*a(a|b){2}", {'a', 'b', 'c'})
+    accepts = fa.codegen(tmp_path)
+
+    assert fa.codegen() is accepts
+    assert len(list(tmp_path.iterdir())) == 1
+
+    for n in range(6):
+        for letters in itertools.product('abc', repeat=n):
+            word = ''.join(letters)
+            assert accepts(word) == fa.accepts(word)
+
+    with pytest.raises(ValueError):
+        accepts("abd")
+
+    assert FiniteAutomaton.from_regex(r"(a|b)*a(a|b){2}", {'a', 'b', 'c'}).codegen(tmp_path)("babb")
+    assert len(list(tmp_path.iterdir())) == 1
+
+    fa.enable_stats(lambda phase, seconds: None)
+    copy = pickle.loads(pickle.dumps(fa))
+
+    assert copy.codegen(tmp_path)("babb")
+    assert copy.stats()["compute_steps"] == 0
+
+
+def test_stats() -> None:
+    fa = FiniteAutomaton.from_regex(r"(a|b)*a(a|b){3}")
+    phases: List[str] = []
+
+    assert fa.stats() == {}
+
+    fa.enable_stats(lambda phase, seconds: phases.append(phase))
+    assert len(list(fa.compute("abba"))) == 5
+    assert fa.accepts("abbb") and fa.accepts("abbb")
+
+    assert fa.run(iter("abab")) in fa.determinize().states
+    assert fa.accepts_many(["ab", "aab"]) == [False, False]
+
+    stats = fa.stats()
+    assert stats["compute_steps"] == 4
+    assert stats["symbols_consumed"] == 4 + 4 + 5
+    assert stats["subsets_created"] == len(fa.determinize().states)
+    assert stats["queue_high_water"] >= 1
+    assert stats["closure_computations"] == len(fa.states)
+    assert stats["memo_hits"] == 1
+    assert phases == ["remove_epsilon_transitions", "determinize", "compile"]
+
+    fa.disable_stats()
+    assert fa.stats() == {} and fa.determinize().stats() == {}
+
+
+def test_issubset_scaling() -> None:
+    def blowup(n: int) -> FiniteAutomaton[int, str]:
+        # nfa for (a|b)*a(a|b)^n, whose dfa has 2^(n+1) states
+        transitions: Dict[Tuple[int, str], Set[int]] = {(0, 'a'): {0, 1}, (0, 'b'): {0}}
+
+        for i in range(1, n + 1):
+            transitions[(i, 'a')] = {i + 1}
+            transitions[(i, 'b')] = {i + 1}
+
+        return FiniteAutomaton(set(range(n + 2)), {'a', 'b'}, transitions, 0, {n + 1})
+
+    began = time.perf_counter()
+
+    assert blowup(30).issubset(blowup(30))
+    assert not blowup(12).issubset(blowup(11))
+    assert blowup(200).issubset(blowup(200))
+
+    universal = FiniteAutomaton({0}, {'a', 'b'}, {(0, 'a'): {0}, (0, 'b'): {0}}, 0, {0})
+    assert blowup(1000).issubset(universal)
+    assert not universal.issubset(blowup(1000))
+    assert time.perf_counter() - began < 5
+
+
+def test_finditer_linear() -> None:
+    fa = FiniteAutomaton.from_regex("a*b|a")
+    text = "a" * 50_000
+    began = time.perf_counter()
+
+    assert list(fa.finditer(text)) == [Match(i, i + 1) for i in range(len(text))]
+    assert list(fa.finditer(text.encode() + b"b")) == [Match(0, len(text) + 1)]
+    assert time.perf_counter() - began < 5